@@ -9,25 +9,16 @@ Architecture propre:
 """
 from fastapi import APIRouter, HTTPException, Depends
 from typing import List
-from pydantic import BaseModel
 
 from api.auth_admin import require_admin_auth
 from app.crud import artworks as artworks_crud
 from app.crud import artwork_types as types_crud
+from app.models.artwork_type import CreateArtworkTypeRequest, UpdateArtworkTypeRequest
+from app.utils.string_utils import decode_path_param, normalize_string
 
 router = APIRouter()
 
 
-class CreateTypeRequest(BaseModel):
-    name: str
-    display_name: str | None = None
-
-
-class UpdateTypeRequest(BaseModel):
-    newType: str
-    display_name: str | None = None
-
-
 @router.get("/", response_model=List[str])
 def get_artwork_types():
     """
@@ -41,7 +32,7 @@ def get_artwork_types():
 
 
 @router.post("/")
-def create_artwork_type(request: CreateTypeRequest, _: bool = Depends(require_admin_auth)):
+def create_artwork_type(request: CreateArtworkTypeRequest, _: bool = Depends(require_admin_auth)):
     """
     Crée un nouveau type d'œuvre.
     
@@ -88,13 +79,7 @@ def delete_artwork_type(type_name: str, _: bool = Depends(require_admin_auth)):
         404: Si le type n'existe pas
     """
     # Tolérance d'encodage des paramètres de path (plus et %xx, double-encodage)
-    from urllib.parse import unquote_plus
-    decoded_name = type_name
-    for _ in range(2):
-        new = unquote_plus(decoded_name)
-        if new == decoded_name:
-            break
-        decoded_name = new
+    decoded_name = decode_path_param(type_name)
 
     # Vérifier que le type existe
     existing = types_crud.get_artwork_type_by_name(decoded_name, normalized=True)
@@ -121,7 +106,7 @@ def delete_artwork_type(type_name: str, _: bool = Depends(require_admin_auth)):
 @router.put("/{type_name}")
 def update_artwork_type_endpoint(
     type_name: str, 
-    request: UpdateTypeRequest, 
+    request: UpdateArtworkTypeRequest, 
     _: bool = Depends(require_admin_auth)
 ):
     """
@@ -144,13 +129,7 @@ def update_artwork_type_endpoint(
         raise HTTPException(status_code=400, detail="Le nouveau nom de type ne peut pas être vide")
     
     # Tolérance d'encodage du paramètre path
-    from urllib.parse import unquote_plus
-    decoded_name = type_name
-    for _ in range(2):
-        new = unquote_plus(decoded_name)
-        if new == decoded_name:
-            break
-        decoded_name = new
+    decoded_name = decode_path_param(type_name)
 
     # Vérifier que l'ancien type existe
     existing_old = types_crud.get_artwork_type_by_name(decoded_name, normalized=True)
@@ -158,22 +137,14 @@ def update_artwork_type_endpoint(
         raise HTTPException(status_code=404, detail=f"Le type '{decoded_name}' n'existe pas")
 
     # Vérifier que le nouveau nom est différent (comparaison normalisée)
-    from app.utils.string_utils import normalize_string
     if normalize_string(decoded_name) == normalize_string(new_type):
         raise HTTPException(status_code=400, detail="Le nouveau type doit être différent de l'ancien")
     
-    # Vérifier que le nouveau nom n'est pas déjà pris
-    existing_new = types_crud.get_artwork_type_by_name(new_type, normalized=True)
-    if existing_new:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Le type '{new_type}' existe déjà. Utilisez un nom différent."
-        )
-    
     type_id = str(existing_old["_id"])
     
     try:
         # Mettre à jour le nom dans la collection artwork_types
+        # (ValueError si le nouveau nom est déjà pris, via l'index unique)
         success = types_crud.update_artwork_type(
             type_id=type_id,
             name=new_type,
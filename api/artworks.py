@@ -1,35 +1,39 @@
 from fastapi import APIRouter, HTTPException, Request, BackgroundTasks, Query
 from typing import List
 from app.models.artwork import Artwork, ArtworkInDB, UpdateTypeRequest, TranslateDescriptionRequest, UpdateDescriptionRequest
-from app.crud import artworks
-from app.utils.string_utils import normalize_string
+from app.crud import artworks, artwork_types
+from app.utils.string_utils import normalize_string, decode_path_param
 from fastapi import Depends
 from api.auth_admin import require_admin_auth
 from app.services.email.notifications import notify_new_artwork, notify_removed_artwork
 from app.database import artworks_collection
-from app.services.translation import apply_dynamic_translations, _translate_with_deepl
-from bson import ObjectId
+from app.services.translation import apply_dynamic_translations, apply_dynamic_translations_many, resolve_language, _translate_with_deepl
+from app.utils.object_id import parse_object_id
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-SUPPORTED_LANGUAGES = {"fr", "en"}
 TRANSLATABLE_ARTWORK_FIELDS = ("title", "type")
 
-
-def resolve_language(lang: str) -> str:
-    if not lang:
-        return "fr"
-    normalized = lang.lower()
-    return normalized if normalized in SUPPORTED_LANGUAGES else "fr"
-
 def serialize_artwork(raw: dict, lang: str = "fr") -> dict:
     """
     Convertit le BSON ObjectId en str pour la sérialisation JSON.
     """
     translated_doc = apply_dynamic_translations(raw, TRANSLATABLE_ARTWORK_FIELDS, lang, artworks_collection)
-    
+    return build_artwork_payload(translated_doc, lang)
+
+def serialize_artworks(raws: List[dict], lang: str = "fr") -> List[dict]:
+    """
+    Sérialise une liste d'œuvres ; les nouvelles traductions sont enregistrées en un seul bulk_write.
+    """
+    translated_docs = apply_dynamic_translations_many(raws, TRANSLATABLE_ARTWORK_FIELDS, lang, artworks_collection)
+    return [build_artwork_payload(doc, lang) for doc in translated_docs]
+
+def build_artwork_payload(translated_doc: dict, lang: str = "fr") -> dict:
+    """
+    Construit la réponse JSON d'une œuvre déjà traduite.
+    """
     # Handle description manually: use translations.en.description if lang=en
     description = translated_doc.get("description", "")
     if lang == "en":
@@ -62,11 +66,13 @@ def serialize_artwork(raw: dict, lang: str = "fr") -> dict:
     return result
 
 @router.get("/", response_model=List[ArtworkInDB])
-def list_artworks(lang: str = Query("fr")):
+def list_artworks(lang: str = Query("fr"), skip: int = Query(0, ge=0), limit: int = Query(0, ge=0)):
+    """
+    Liste les œuvres ; skip/limit permettent de paginer (limit = 0 : toutes les œuvres).
+    """
     language = resolve_language(lang)
-    raws = artworks.get_all_artworks()
-    serialized = [serialize_artwork(a, language) for a in raws]
-    return serialized
+    raws = artworks.get_all_artworks(skip=skip, limit=limit)
+    return serialize_artworks(raws, language)
 
 @router.get("/gallery-types", response_model=List[str])
 def get_gallery_types():
@@ -74,7 +80,6 @@ def get_gallery_types():
     DEPRECATED: Utiliser /api/artwork-types/ à la place.
     Retourne tous les types d'œuvres depuis la collection artwork_types.
     """
-    from app.crud import artwork_types
     return artwork_types.get_artwork_types_names()
 
 @router.get("/by-gallery/{gallery_type}", response_model=List[ArtworkInDB])
@@ -83,30 +88,15 @@ def get_artworks_by_gallery(gallery_type: str, lang: str = Query("fr")):
     Retourne les œuvres d'un type de galerie spécifique
     """
     language = resolve_language(lang)
-    artworks_data = artworks.get_all_artworks()
-    filtered_artworks = []
     # Tolérance d'encodage : décoder + et %XX et gérer double-encodage éventuel
-    from urllib.parse import unquote_plus
-    decoded = gallery_type
-    for _ in range(2):
-        new = unquote_plus(decoded)
-        if new == decoded:
-            break
-        decoded = new
+    decoded = decode_path_param(gallery_type)
 
     # Normaliser le type de galerie pour la comparaison (insensible à la casse, accents, espaces et caractères spéciaux)
     normalized_gallery_type = normalize_string(decoded)
     
-    for artwork in artworks_data:
-        # Normaliser le type de l'artwork de la même manière
-        artwork_type = artwork.get('type', '') or ''
-        normalized_artwork_type = normalize_string(artwork_type)
-        
-        # Filtrer seulement par type, pas par statut (afficher toutes les œuvres)
-        if normalized_artwork_type == normalized_gallery_type:
-            filtered_artworks.append(serialize_artwork(artwork, language))
-    
-    return filtered_artworks
+    # Filtrer seulement par type, pas par statut (afficher toutes les œuvres)
+    artworks_data = artworks.get_artworks_by_normalized_type(normalized_gallery_type)
+    return serialize_artworks(artworks_data, language)
 
 @router.get("/gallery-types/all", response_model=List[str])
 def get_all_gallery_types():
@@ -114,7 +104,6 @@ def get_all_gallery_types():
     Retourne tous les types d'œuvres depuis la collection artwork_types.
     Source unique: pas de fallback vers les artworks.
     """
-    from app.crud import artwork_types
     return artwork_types.get_artwork_types_names()
 
 @router.get("/{artwork_id}", response_model=ArtworkInDB)
@@ -135,7 +124,7 @@ def create_artwork(
     """
     Crée une nouvelle œuvre et notifie les abonnés à la newsletter.
     """
-    created_id = artworks.create_artwork(artwork.dict())
+    created_id = artworks.create_artwork(artwork.model_dump())
     created_doc = artworks.get_artwork_by_id(created_id)
     if not created_doc:
         raise HTTPException(status_code=500, detail="Erreur lors de la récupération de l'œuvre créée")
@@ -180,7 +169,7 @@ def translate_description(
             raise HTTPException(status_code=500, detail="Translation failed")
         
         # Sauvegarder en DB dans translations.en.description
-        oid = ObjectId(request.artwork_id)
+        oid = parse_object_id(request.artwork_id)
         artworks_collection.update_one(
             {"_id": oid},
             {
@@ -216,7 +205,7 @@ def update_description_en(
             raise HTTPException(status_code=404, detail="Artwork not found")
         
         # Sauvegarder en DB
-        oid = ObjectId(request.artwork_id)
+        oid = parse_object_id(request.artwork_id)
         artworks_collection.update_one(
             {"_id": oid},
             {
@@ -239,22 +228,10 @@ def update_description_en(
 
 @router.put("/{artwork_id}", response_model=ArtworkInDB)
 def update_artwork(artwork_id: str, artwork: Artwork, _: bool = Depends(require_admin_auth), request: Request = None):
-    # Vérifier d'abord que l'artwork existe
-    existing_doc = artworks.get_artwork_by_id(artwork_id)
-    if not existing_doc:
-        raise HTTPException(status_code=404, detail="Artwork not found")
-    
-    modified_count = artworks.update_artwork(artwork_id, artwork.dict())
-    
-    # Si aucune modification n'a été faite, retourner l'artwork existant
-    # (cela peut arriver si les données sont identiques)
-    if modified_count == 0:
-        return serialize_artwork(existing_doc)
-    
-    # Sinon, récupérer l'artwork mis à jour
-    updated_doc = artworks.get_artwork_by_id(artwork_id)
+    # Écriture et lecture du document à jour en un seul aller-retour
+    updated_doc = artworks.update_artwork_returning(artwork_id, artwork.model_dump())
     if not updated_doc:
-        raise HTTPException(status_code=404, detail="Artwork not found after update")
+        raise HTTPException(status_code=404, detail="Artwork not found")
     return serialize_artwork(updated_doc)
 
 @router.delete("/{artwork_id}")
@@ -6,7 +6,7 @@ import hmac
 import hashlib
 import base64
 import json
-from datetime import datetime, timedelta
+import time
 
 router = APIRouter()
 
@@ -14,29 +14,41 @@ router = APIRouter()
 ADMIN_USERNAME = os.getenv("ADMIN_USERNAME", "admin")
 ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "admin123")
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-this-in-production")
+SECRET_KEY_BYTES = SECRET_KEY.encode()
+# HMAC initialisé une fois avec la clé ; chaque signature part d'une copie
+_HMAC_BASE = hmac.new(SECRET_KEY_BYTES, digestmod=hashlib.sha256)
 SESSION_DURATION_HOURS = int(os.getenv("SESSION_DURATION_HOURS", "2"))
+SESSION_DURATION_SECONDS = SESSION_DURATION_HOURS * 3600
+
+# Identifiants encodés une seule fois pour la comparaison à temps constant
+ADMIN_USERNAME_BYTES = ADMIN_USERNAME.encode()
+ADMIN_PASSWORD_BYTES = ADMIN_PASSWORD.encode()
 
 def authenticate_admin(username: str, password: str) -> bool:
-    """Vérifier les identifiants admin"""
-    return username == ADMIN_USERNAME and password == ADMIN_PASSWORD
+    """Vérifier les identifiants admin (comparaison à temps constant)"""
+    # Les deux comparaisons sont toujours évaluées pour ne pas révéler lequel est faux
+    username_ok = hmac.compare_digest(username.encode(), ADMIN_USERNAME_BYTES)
+    password_ok = hmac.compare_digest(password.encode(), ADMIN_PASSWORD_BYTES)
+    return username_ok and password_ok
+
+def sign_payload(payload_b64: str) -> str:
+    """Signature HMAC-SHA256 (base64 url-safe sans padding) d'un payload encodé"""
+    # Copier l'HMAC pré-initialisé évite de redériver la clé à chaque signature
+    signer = _HMAC_BASE.copy()
+    signer.update(payload_b64.encode())
+    return base64.urlsafe_b64encode(signer.digest()).decode().rstrip('=')
 
 def create_signed_cookie() -> str:
     """Créer un cookie signé avec seulement la date d'expiration en timestamp UTC"""
-    # Créer le payload avec timestamp UTC
-    expiry = datetime.utcnow() + timedelta(hours=SESSION_DURATION_HOURS)
-    payload = {"exp": int(expiry.timestamp())}  # Timestamp UTC entier
+    # Créer le payload avec timestamp UTC (epoch, pas de datetime intermédiaire)
+    payload = {"exp": int(time.time()) + SESSION_DURATION_SECONDS}  # Timestamp UTC entier
     
     # Encoder en base64
     payload_json = json.dumps(payload, separators=(',', ':'))
     payload_b64 = base64.urlsafe_b64encode(payload_json.encode()).decode().rstrip('=')
     
     # Créer la signature HMAC
-    signature = hmac.new(
-        SECRET_KEY.encode(),
-        payload_b64.encode(),
-        hashlib.sha256
-    ).digest()
-    signature_b64 = base64.urlsafe_b64encode(signature).decode().rstrip('=')
+    signature_b64 = sign_payload(payload_b64)
     
     # Retourner le cookie signé : payload.signature
     return f"{payload_b64}.{signature_b64}"
@@ -55,12 +67,7 @@ def verify_signed_cookie(cookie_value: str) -> bool:
         payload_b64, signature_b64 = parts
         
         # Vérifier la signature
-        expected_signature = hmac.new(
-            SECRET_KEY.encode(),
-            payload_b64.encode(),
-            hashlib.sha256
-        ).digest()
-        expected_signature_b64 = base64.urlsafe_b64encode(expected_signature).decode().rstrip('=')
+        expected_signature_b64 = sign_payload(payload_b64)
         
         if not hmac.compare_digest(signature_b64, expected_signature_b64):
             return False
@@ -76,8 +83,7 @@ def verify_signed_cookie(cookie_value: str) -> bool:
         
         # Vérifier l'expiration avec timestamp UTC
         expiry_timestamp = payload["exp"]
-        current_timestamp = int(datetime.utcnow().timestamp())
-        if current_timestamp > expiry_timestamp:
+        if time.time() > expiry_timestamp:
             return False
         
         return True
@@ -103,7 +109,7 @@ def get_cookie_settings(request: Request, is_delete: bool = False):
     else:
         return {
             "httponly": True,
-            "max_age": SESSION_DURATION_HOURS * 3600,
+            "max_age": SESSION_DURATION_SECONDS,
             "secure": is_production or is_vercel_preview,
             "samesite": "none" if is_vercel_preview else "lax",
             "domain": None
@@ -157,10 +163,14 @@ async def login(request: Request, response: Response, creds: LoginRequest):
 
 @router.get("/verify")
 async def verify(request: Request, response: Response, _: bool = Depends(require_admin_auth)):
-    # Ajouter Cache-Control pour éviter la mise en cache
-    response.headers["Cache-Control"] = "no-store, no-cache, must-revalidate, private"
-    response.headers["Pragma"] = "no-cache"
-    response.headers["Expires"] = "0"
+    # Le cookie est toujours vérifié (dépendance) ; seul le corps est évité si inchangé.
+    # ETag lié au cookie : un nouveau login (ou un autre admin) change la valeur
+    etag = '"' + hashlib.sha1(request.cookies["auth_token"].encode()).hexdigest() + '"'
+    # no-cache : le navigateur doit revalider à chaque fois (pas de réponse périmée après logout)
+    cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=cache_headers)
+    response.headers.update(cache_headers)
     
     return {"valid": True, "username": ADMIN_USERNAME}
 
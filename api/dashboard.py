@@ -1,11 +1,31 @@
 from fastapi import APIRouter, Request, HTTPException, Depends
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from bson import ObjectId
 from api.auth_admin import require_admin_auth
 from app.database import get_database
 from collections import defaultdict
+import logging
 
+logger = logging.getLogger(__name__)
 router = APIRouter()
 
+
+def _parse_created_at(value) -> Optional[datetime]:
+    """Convertit created_at (datetime ou chaîne ISO) en datetime, None si invalide."""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value
+    try:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    # Ramener en UTC naïf pour rester comparable aux dates renvoyées par MongoDB
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
 @router.get("/dashboard/stats")
 def get_dashboard_stats(request: Request, _: bool = Depends(require_admin_auth)):
 
@@ -17,32 +37,37 @@ def get_dashboard_stats(request: Request, _: bool = Depends(require_admin_auth))
         # --- Récupération des données ---
         try:
             orders = list(db["orders"].find({"created_at": {"$gte": thirty_days_ago}}))
-        except Exception as e:
-            print(f"Erreur récupération orders: {e}")
+        except Exception:
+            logger.exception("Erreur récupération orders")
             orders = []
             
         try:
-            artworks = list(db["artworks"].find())
-        except Exception as e:
-            print(f"Erreur récupération artworks: {e}")
+            # Seuls les champs utilisés par les statistiques d'inventaire sont rapatriés
+            artworks = list(db["artworks"].find({}, {"type": 1, "status": 1, "is_available": 1, "price": 1}))
+        except Exception:
+            logger.exception("Erreur récupération artworks")
             artworks = []
         
-        # --- Ventes par jour ---
-        daily_sales_data = defaultdict(lambda: {"orders_count": 0, "daily_revenue": 0})
+        # --- Dates des commandes (parsées une seule fois, lignes invalides ignorées) ---
+        dated_orders = []
         for order in orders:
-            try:
-                if "created_at" in order and order["created_at"]:
-                    created_at = order["created_at"]
-                    if isinstance(created_at, str):
-                        from datetime import datetime as dt
-                        created_at = dt.fromisoformat(created_at.replace('Z', '+00:00'))
-                    
-                    date_key = created_at.date().isoformat()
-                    daily_sales_data[date_key]["orders_count"] += 1
-                    daily_sales_data[date_key]["daily_revenue"] += order.get("total", 0)
-            except Exception as e:
-                print(f"Erreur traitement order {order.get('_id', 'unknown')}: {e}")
-                continue
+            created_at = _parse_created_at(order.get("created_at"))
+            if created_at is not None:
+                dated_orders.append((created_at, order.get("total", 0)))
+        skipped = len(orders) - len(dated_orders)
+        if skipped:
+            logger.warning("Dashboard: %d commandes ignorées (created_at invalide)", skipped)
+        
+        # --- Ventes par jour et tendances mensuelles ---
+        daily_sales_data = defaultdict(lambda: {"orders_count": 0, "daily_revenue": 0})
+        monthly_data = defaultdict(lambda: {"orders": 0, "revenue": 0})
+        for created_at, total in dated_orders:
+            daily = daily_sales_data[created_at.date().isoformat()]
+            daily["orders_count"] += 1
+            daily["daily_revenue"] += total
+            monthly = monthly_data[created_at.strftime('%Y-%m')]
+            monthly["orders"] += 1
+            monthly["revenue"] += total
         
         daily_sales = [
             {"date": date, **data}
@@ -51,13 +76,21 @@ def get_dashboard_stats(request: Request, _: bool = Depends(require_admin_auth))
         
         # --- Œuvres les plus vendues ---
         artwork_sales = defaultdict(int)
-        artwork_names = {}
-        for artwork in artworks:
-            artwork_names[str(artwork["_id"])] = artwork.get("title", "Sans titre")
         for order in orders:
             for item in order.get("items", []):
                 artwork_id = str(item.get("artwork_id", ""))
                 artwork_sales[artwork_id] += item.get("quantity", 1)
+        top_sales = sorted(artwork_sales.items(), key=lambda x: x[1], reverse=True)[:10]
+        
+        # Résoudre uniquement les titres du top 10 (au lieu de charger toutes les œuvres)
+        top_ids = [ObjectId(artwork_id) for artwork_id, _ in top_sales if ObjectId.is_valid(artwork_id)]
+        artwork_names = {}
+        if top_ids:
+            try:
+                for artwork in db["artworks"].find({"_id": {"$in": top_ids}}, {"title": 1}):
+                    artwork_names[str(artwork["_id"])] = artwork.get("title", "Sans titre")
+            except Exception:
+                logger.exception("Erreur récupération titres des œuvres")
         
         popular_artworks = [
             {
@@ -65,28 +98,10 @@ def get_dashboard_stats(request: Request, _: bool = Depends(require_admin_auth))
                 "title": artwork_names.get(artwork_id, "Inconnu"),
                 "sales_count": count
             }
-            for artwork_id, count in sorted(artwork_sales.items(), key=lambda x: x[1], reverse=True)[:10]
+            for artwork_id, count in top_sales
         ]
         
         # --- Tendances mensuelles ---
-        monthly_data = defaultdict(lambda: {"orders": 0, "revenue": 0, "total_amount": 0})
-        for order in orders:
-            try:
-                if "created_at" in order and order["created_at"]:
-                    created_at = order["created_at"]
-                    if isinstance(created_at, str):
-                        from datetime import datetime as dt
-                        created_at = dt.fromisoformat(created_at.replace('Z', '+00:00'))
-                    
-                    month_key = created_at.strftime('%Y-%m')
-                    monthly_data[month_key]["orders"] += 1
-                    total = order.get("total", 0)
-                    monthly_data[month_key]["revenue"] += total
-                    monthly_data[month_key]["total_amount"] += total
-            except Exception as e:
-                print(f"Erreur traitement tendance mensuelle: {e}")
-                continue
-        
         monthly_trends = []
         for month, data in monthly_data.items():
             avg_order_value = data["revenue"] / data["orders"] if data["orders"] > 0 else 0
@@ -146,30 +161,11 @@ def get_dashboard_stats(request: Request, _: bool = Depends(require_admin_auth))
         }
         
         # --- Moyenne des jours entre commandes ---
-        try:
-            if len(orders) > 1:
-                order_dates = []
-                for order in orders:
-                    if "created_at" in order and order["created_at"]:
-                        try:
-                            created_at = order["created_at"]
-                            if isinstance(created_at, str):
-                                from datetime import datetime as dt
-                                created_at = dt.fromisoformat(created_at.replace('Z', '+00:00'))
-                            order_dates.append(created_at)
-                        except Exception as e:
-                            print(f"Erreur parsing date: {e}")
-                            continue
-                if len(order_dates) > 1:
-                    order_dates.sort()
-                    days_between = [(order_dates[i] - order_dates[i-1]).days for i in range(1, len(order_dates))]
-                    avg_days_between_orders = sum(days_between) / len(days_between) if days_between else 0
-                else:
-                    avg_days_between_orders = 0
-            else:
-                avg_days_between_orders = 0
-        except Exception as e:
-            print(f"Erreur calcul jours entre commandes: {e}")
+        order_dates = sorted(created_at for created_at, _ in dated_orders)
+        if len(order_dates) > 1:
+            days_between = [(order_dates[i] - order_dates[i-1]).days for i in range(1, len(order_dates))]
+            avg_days_between_orders = sum(days_between) / len(days_between)
+        else:
             avg_days_between_orders = 0
         
         return {
@@ -186,9 +182,9 @@ def get_dashboard_stats(request: Request, _: bool = Depends(require_admin_auth))
                 "conversion_data": conversion_data,
                 "avg_days_between_orders": avg_days_between_orders
             },
-            "last_updated": datetime.now().isoformat()
+            "last_updated": datetime.now()
         }
 
     except Exception as e:
-        print(f"Erreur dashboard: {e}")
+        logger.exception("Erreur dashboard")
         raise HTTPException(status_code=500, detail=f"Erreur dashboard: {e}")
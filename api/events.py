@@ -1,42 +1,97 @@
-from fastapi import APIRouter, HTTPException, Request, Depends, BackgroundTasks, Query
-from typing import List
+from fastapi import APIRouter, HTTPException, Request, Response, Depends, BackgroundTasks, Query
+from fastapi.responses import StreamingResponse
+from typing import Dict, Iterator, List, Tuple
+import hashlib
 from app.models.event import Event
-from app.crud.events import get_all_events, get_event_by_id, create_event, update_event, delete_event
+from app.crud.events import iter_all_events, get_event_by_id, create_event, update_event_returning, delete_event, get_events_fingerprint
 from api.auth_admin import require_admin_auth
 from app.services.email.notifications import notify_new_event
 from app.database import events_collection
-from app.services.translation import apply_dynamic_translations
+from app.services.translation import apply_dynamic_translations, has_missing_translations, resolve_language
+from app.utils.json_utils import dumps, iter_json_array
 
-SUPPORTED_LANGUAGES = {"fr", "en"}
 TRANSLATABLE_EVENT_FIELDS = ("title", "description", "location", "status")
 
+router = APIRouter()
 
-def resolve_language(lang: str) -> str:
-    if not lang:
-        return "fr"
-    normalized = lang.lower()
-    return normalized if normalized in SUPPORTED_LANGUAGES else "fr"
+# Corps de réponse constant de la suppression, encodé une seule fois
+EVENT_DELETED_PAYLOAD = dumps({"message": "Événement supprimé avec succès"})
 
-router = APIRouter()
+# Dernière liste sérialisée par langue : {langue: (etag, corps JSON)}
+EVENTS_BODY_CACHE: Dict[str, Tuple[str, bytes]] = {}
 
 def serialize_event(raw: dict, lang: str = "fr") -> dict:
     """
     Convertit l'ObjectId MongoDB en string et remplace _id par id pour le frontend.
+    updated_at ne sert qu'à l'ETag de la liste : il n'est pas exposé.
     """
-    translated = apply_dynamic_translations(raw, TRANSLATABLE_EVENT_FIELDS, lang, events_collection)
-    event_payload = dict(translated)
-    event_payload["id"] = str(translated["_id"])
-    event_payload.pop("_id", None)
+    # apply_dynamic_translations renvoie déjà une copie : on la modifie directement
+    event_payload = apply_dynamic_translations(raw, TRANSLATABLE_EVENT_FIELDS, lang, events_collection)
+    event_payload["id"] = str(event_payload.pop("_id"))
+    event_payload.pop("updated_at", None)
     return event_payload
 
+def compute_events_etag(language: str) -> str:
+    """
+    Calcule un ETag à partir de l'empreinte de la collection (nombre + dernier updated_at).
+    """
+    count, last_updated = get_events_fingerprint()
+    digest = hashlib.sha1(f"{language}:{count}:{last_updated}".encode()).hexdigest()
+    return f'"{digest}"'
+
+def serialize_events(language: str, untranslated: List[str]) -> Iterator[dict]:
+    """
+    Sérialise les événements au fil du curseur ; les ids des événements restés sans
+    traduction (DeepL indisponible) sont ajoutés à untranslated.
+    """
+    for event in iter_all_events():
+        event_payload = serialize_event(event, language)
+        if has_missing_translations(event_payload, TRANSLATABLE_EVENT_FIELDS, language):
+            untranslated.append(event_payload["id"])
+        yield event_payload
+
+def cache_events_body(language: str, etag: str, chunks: Iterator[bytes]) -> Iterator[bytes]:
+    """
+    Relaie les morceaux du flux tout en les conservant ; le corps complet n'est mis
+    en cache que si le flux a été entièrement envoyé.
+    """
+    parts = []
+    for chunk in chunks:
+        parts.append(chunk)
+        yield chunk
+    EVENTS_BODY_CACHE[language] = (etag, b"".join(parts))
+
 @router.get("/", response_model=List[dict])
-def read_events(lang: str = Query("fr")):
+def read_events(request: Request, lang: str = Query("fr")):
     """
     Retourne la liste de tous les événements.
+    Renvoie 304 si la liste n'a pas changé depuis le dernier appel du client (If-None-Match).
+    En français, la liste est envoyée en flux au fil du curseur MongoDB ; les autres langues
+    sont construites en mémoire pour savoir, avant d'envoyer les en-têtes, si tout a été traduit.
+    La liste est ensuite servie depuis le cache mémoire tant que l'ETag ne change pas.
     """
     language = resolve_language(lang)
-    events = get_all_events()
-    return [serialize_event(event, language) for event in events]
+    etag = compute_events_etag(language)
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    cached = EVENTS_BODY_CACHE.get(language)
+    if cached and cached[0] == etag:
+        return Response(content=cached[1], media_type="application/json", headers={"ETag": etag})
+    untranslated: List[str] = []
+    events = serialize_events(language, untranslated)
+    if language == "fr":
+        return StreamingResponse(
+            cache_events_body(language, etag, iter_json_array(events)),
+            media_type="application/json",
+            headers={"ETag": etag}
+        )
+    body = b"".join(iter_json_array(events))
+    if untranslated:
+        # Traduction incomplète (DeepL indisponible) : ni cache ni ETag, l'enregistrement des
+        # traductions ne changeant pas l'ETag, le client garderait sinon ce corps via des 304
+        return Response(content=body, media_type="application/json", headers={"Cache-Control": "no-store"})
+    EVENTS_BODY_CACHE[language] = (etag, body)
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
 
 @router.get("/{event_id}", response_model=dict)
 def read_event(event_id: str, lang: str = Query("fr")):
@@ -59,7 +114,7 @@ def create_event_endpoint(
     """
     Crée un nouvel événement.
     """
-    event_dict = event.dict()
+    event_dict = event.model_dump()
     event_id = create_event(event_dict)
     created_event = get_event_by_id(event_id)
     if not created_event:
@@ -72,23 +127,11 @@ def update_event_endpoint(event_id: str, event: Event, request: Request = None,
     """
     Met à jour un événement existant.
     """
-    # Vérifier d'abord que l'événement existe
-    existing_event = get_event_by_id(event_id)
-    if not existing_event:
+    updated_event, changed = update_event_returning(event_id, event.model_dump())
+    if updated_event is None:
         raise HTTPException(status_code=404, detail="Événement non trouvé")
-    
-    event_dict = event.dict()
-    modified_count = update_event(event_id, event_dict)
-    
-    # Si aucune modification n'a été faite, retourner un succès
-    # (cela peut arriver si les données sont identiques)
-    if modified_count == 0:
-        return {"message": "Événement inchangé", "event": serialize_event(existing_event)}
-    
-    # Sinon, récupérer l'événement mis à jour et le retourner
-    updated_event = get_event_by_id(event_id)
-    if not updated_event:
-        raise HTTPException(status_code=404, detail="Événement non trouvé après mise à jour")
+    if not changed:
+        return {"message": "Événement inchangé", "event": serialize_event(updated_event)}
     
     return {"message": "Événement mis à jour avec succès", "event": serialize_event(updated_event)}
 
@@ -100,4 +143,4 @@ def delete_event_endpoint(event_id: str, request: Request = None, _: bool = Depe
     deleted_count = delete_event(event_id)
     if deleted_count == 0:
         raise HTTPException(status_code=404, detail="Événement non trouvé")
-    return {"message": "Événement supprimé avec succès"}
+    return Response(content=EVENT_DELETED_PAYLOAD, media_type="application/json")
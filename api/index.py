@@ -1,40 +1,46 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 import os
 import sys
 
-# Ajouter le dossier parent au path pour que les imports fonctionnent sur Vercel
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-try:
-    from api.artworks import router as artworks_router
-    from api.artwork_types import router as artwork_types_router
-    from api.events import router as events_router
-    from api.orders import router as orders_router
-    from api.dashboard import router as dashboard_router
-    from api.auth_admin import router as auth_router
-    from api.subscribe import router as subscribe_router_old  # Ancien endpoint (deprecated)
-    from app.routers.newsletter import router as newsletter_router
-except ImportError:
-    # Fallback aux imports relatifs si les absolus ne marchent pas
-    from .artworks import router as artworks_router
-    from .artwork_types import router as artwork_types_router
-    from .events import router as events_router
-    from .orders import router as orders_router
-    from .dashboard import router as dashboard_router
-    from .auth_admin import router as auth_router
-    from .subscribe import router as subscribe_router_old  # Ancien endpoint (deprecated)
-    from app.routers.newsletter import router as newsletter_router
+# Vercel charge ce fichier directement : la racine du projet doit être importable
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from app.logging_config import setup_logging
+
+# Logging configuré avant l'import des routers (écriture déportée dans un thread)
+setup_logging()
+
+from api.artworks import router as artworks_router
+from api.artwork_types import router as artwork_types_router
+from api.events import router as events_router
+from api.orders import router as orders_router
+from api.dashboard import router as dashboard_router
+from api.auth_admin import router as auth_router
+from api.subscribe import router as subscribe_router_old  # Ancien endpoint (deprecated)
+from api.webhook_mailerlite import router as webhook_router
+from app.routers.newsletter import router as newsletter_router
+from app.utils.json_utils import OrjsonResponse, dumps
 
 app = FastAPI(
     title="Elisabeth Constantin API",
     description="API pour le site d'art d'Elisabeth Constantin",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=OrjsonResponse
 )
 
 # Configuration CORS
 allowed_origins_str = os.getenv("FRONTEND_URL", "http://localhost:5173")
-allowed_origins = [origin.strip() for origin in allowed_origins_str.split(",")]
+# frozenset : CORSMiddleware teste "origin in allow_origins" à chaque requête
+allowed_origins = frozenset(
+    origin.strip() for origin in allowed_origins_str.split(",") if origin.strip()
+)
+
+# Origines supplémentaires par expression régulière (ex: sous-domaines), optionnel
+allowed_origin_regex = os.getenv("FRONTEND_URL_REGEX") or None
 
 # Si on utilise "*" (wildcard), désactiver credentials
 allow_credentials = "*" not in allowed_origins
@@ -42,11 +48,16 @@ allow_credentials = "*" not in allowed_origins
 app.add_middleware(
     CORSMiddleware,
     allow_origins=allowed_origins,
+    allow_origin_regex=allowed_origin_regex,
     allow_credentials=allow_credentials,
     allow_methods=["*"],
     allow_headers=["*"],
+    max_age=86400,  # Le navigateur garde le preflight 24h au lieu de 10 min
 )
 
+# Compression des réponses JSON (les petites réponses, sous 512 octets, ne sont pas compressées)
+app.add_middleware(GZipMiddleware, minimum_size=512, compresslevel=5)
+
 # Routes
 app.include_router(auth_router, prefix="/api/admin", tags=["admin-auth"])
 app.include_router(dashboard_router, prefix="/api/admin", tags=["admin-dashboard"])
@@ -62,38 +73,27 @@ app.include_router(newsletter_router, prefix="/api/newsletter", tags=["newslette
 app.include_router(subscribe_router_old, prefix="/api/subscribe", tags=["subscribe-deprecated"])
 
 # Webhook MailerLite pour synchroniser les statuts
-try:
-    from api.webhook_mailerlite import router as webhook_router
-    app.include_router(webhook_router, prefix="/api/webhooks/mailerlite", tags=["webhooks"])
-except ImportError:
-    from .webhook_mailerlite import router as webhook_router
-    app.include_router(webhook_router, prefix="/api/webhooks/mailerlite", tags=["webhooks"])
-
-@app.get("/")
-async def root():
-    return {
-        "message": "Elisabeth Constantin API - FastAPI",
-        "status": "healthy",
-        "endpoints": {
-            "artworks": "/api/artworks",
-            "events": "/api/events", 
-            "orders": "/api/orders",
-            "admin": "/api/admin"
-        }
-    }
+app.include_router(webhook_router, prefix="/api/webhooks/mailerlite", tags=["webhooks"])
 
-@app.get("/api")
-async def api_root():
-    return {
-        "message": "Elisabeth Constantin API - FastAPI",
-        "status": "healthy",
-        "endpoints": {
-            "artworks": "/api/artworks",
-            "events": "/api/events", 
-            "orders": "/api/orders",
-            "admin": "/api/admin"
-        }
+# Payload statique des routes racine, sérialisé une seule fois au chargement du module
+ROOT_PAYLOAD = dumps({
+    "message": "Elisabeth Constantin API - FastAPI",
+    "status": "healthy",
+    "endpoints": {
+        "artworks": "/api/artworks",
+        "events": "/api/events",
+        "orders": "/api/orders",
+        "admin": "/api/admin"
     }
+})
+
+# Route Starlette brute (sans résolution de dépendances FastAPI) pour les health checks.
+# Une Response neuve par requête : ses en-têtes sont modifiés par les middlewares (CORS)
+async def root(request: Request):
+    return Response(content=ROOT_PAYLOAD, media_type="application/json")
+
+app.add_route("/", root, methods=["GET"], include_in_schema=False)
+app.add_route("/api", root, methods=["GET"], include_in_schema=False)
 
 # L'application FastAPI est automatiquement détectée par Vercel
 # via le nom 'app' et sera servie avec uvicorn
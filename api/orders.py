@@ -1,30 +1,43 @@
-from fastapi import APIRouter, HTTPException, Request, Depends
+from fastapi import APIRouter, HTTPException, Request, Response, Depends, BackgroundTasks, Query
+from fastapi.responses import StreamingResponse
 from typing import List
+import hashlib
 import stripe
 import sys
 import os
 from app.models.order import Order
-from app.crud.orders import create_order, get_order_by_id, update_order_status, get_all_orders, get_orders_by_email as get_orders_by_email_db
+from app.crud.orders import create_order, get_order_by_id, update_order_status, iter_all_orders, get_orders_by_email as get_orders_by_email_db
 from api.auth_admin import require_admin_auth
+from app.utils.json_utils import dumps, iter_json_array
 
 router = APIRouter()
 
 # Configuration Stripe
 stripe_secret_key = os.getenv("STRIPE_SECRET_KEY")
 stripe.api_key = stripe_secret_key
+# Client HTTP unique : les sessions requests gardent les connexions TLS vers Stripe ouvertes
+stripe.default_http_client = stripe.RequestsClient()
 
 def serialize_order(raw: dict) -> dict:
     """
     Convertit l'ObjectId MongoDB en string et remplace _id par id pour le frontend.
     """
-    raw["id"] = str(raw["_id"])
-    del raw["_id"]
+    raw["id"] = str(raw.pop("_id"))
     return raw
 
+def stream_orders(skip: int = 0, limit: int = 0) -> StreamingResponse:
+    """
+    Envoie les commandes en tableau JSON au fil du curseur, sans charger la liste en mémoire.
+    limit = 0 : toutes les commandes.
+    """
+    orders = (serialize_order(order) for order in iter_all_orders(skip=skip, limit=limit))
+    return StreamingResponse(iter_json_array(orders), media_type="application/json")
+
 @router.post("/create-payment-intent")
-async def create_payment_intent(order: Order):
+def create_payment_intent(order: Order):
     """
     Crée une intention de paiement Stripe et sauvegarde la commande.
+    Route synchrone : les appels Stripe et MongoDB bloquants s'exécutent dans le threadpool.
     """
     try:
         # Validation des données d'entrée
@@ -46,12 +59,11 @@ async def create_payment_intent(order: Order):
             }
         )
         
-        order_data = order.dict()
+        order_data = order.model_dump()
         order_data['stripe_payment_intent_id'] = intent.id
         order_data['status'] = 'pending'
         
-        created_order = create_order(order_data)
-        order_id = str(created_order.inserted_id)
+        order_id = create_order(order_data)
         
         return {
             "client_secret": intent.client_secret,
@@ -65,9 +77,10 @@ async def create_payment_intent(order: Order):
         raise HTTPException(status_code=500, detail=f"Erreur serveur: {str(e)}")
 
 @router.post("/confirm-payment")
-async def confirm_payment(payment_data: dict):
+def confirm_payment(payment_data: dict, background_tasks: BackgroundTasks):
     """
     Confirme le paiement et met à jour le statut de la commande.
+    La mise à jour MongoDB est faite en tâche de fond, après l'envoi de la réponse.
     """
     try:
         payment_intent_id = payment_data.get("payment_intent_id")
@@ -79,10 +92,10 @@ async def confirm_payment(payment_data: dict):
         intent = stripe.PaymentIntent.retrieve(payment_intent_id)
         
         if intent.status == "succeeded":
-            update_order_status(order_id, "paid")
+            background_tasks.add_task(update_order_status, order_id, "paid")
             return {"status": "success", "message": "Paiement confirmé"}
         else:
-            update_order_status(order_id, "failed")
+            background_tasks.add_task(update_order_status, order_id, "failed")
             return {"status": "failed", "message": "Paiement échoué"}
             
     except stripe.error.StripeError as e:
@@ -91,22 +104,33 @@ async def confirm_payment(payment_data: dict):
         raise HTTPException(status_code=500, detail=f"Erreur serveur: {str(e)}")
 
 @router.get("/", response_model=List[dict])
-def list_orders(_: bool = Depends(require_admin_auth), request: Request = None):
+def list_orders(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(0, ge=0),
+    _: bool = Depends(require_admin_auth),
+    request: Request = None
+):
     """
-    Retourne toutes les commandes (admin uniquement).
+    Retourne toutes les commandes (admin uniquement), envoyées en flux.
     """
-    orders = get_all_orders()
-    return [serialize_order(order) for order in orders]
+    return stream_orders(skip, limit)
 
 @router.get("/{order_id}", response_model=dict)
-def get_order(order_id: str):
+def get_order(order_id: str, request: Request):
     """
     Retourne une commande par son ID.
+    Aucun statut n'est définitif (une commande payée est ensuite expédiée, livrée ou annulée) :
+    le navigateur revalide à chaque fois (no-cache) et reçoit 304 si la commande n'a pas changé.
     """
     order = get_order_by_id(order_id)
     if not order:
         raise HTTPException(status_code=404, detail="Commande non trouvée")
-    return serialize_order(order)
+    body = dumps(serialize_order(order))
+    etag = f'"{hashlib.sha1(body).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 @router.get("/by-email/{email}", response_model=List[dict])
 def get_orders_by_email(email: str):
@@ -117,10 +141,14 @@ def get_orders_by_email(email: str):
     return [serialize_order(order) for order in orders]
 
 @router.get("/admin/all", response_model=List[dict])
-def get_admin_orders(_: bool = Depends(require_admin_auth), request: Request = None):
+def get_admin_orders(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(0, ge=0),
+    _: bool = Depends(require_admin_auth),
+    request: Request = None
+):
     """
     Retourne toutes les commandes pour l'administration.
     Endpoint spécifique pour le dashboard admin.
     """
-    orders = get_all_orders()
-    return [serialize_order(order) for order in orders]
+    return stream_orders(skip, limit)
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, EmailStr
-from app.crud.subscriptions import get_subscription_by_email, create_subscription
-import secrets
+from app.crud.subscriptions import create_subscription
+from app.utils.promo_codes import generate_promo_code
 
 router = APIRouter()
 
@@ -12,18 +12,18 @@ class SubscribeRequest(BaseModel):
 
 @router.post("/", response_model=dict)
 def subscribe(request: SubscribeRequest):
+    # Normalisation unique à l'entrée : la couche CRUD stocke et compare l'email tel quel
     email = request.email.strip().lower()
 
-    # Vérifier doublon
-    existing = get_subscription_by_email(email)
-    if existing:
-        # Ne pas créer de doublon, retourner code 409
-        raise HTTPException(status_code=409, detail="Email déjà abonné")
-
     # Générer un code promo simple (ex: EC10-AB12C)
-    promo_code = f"EC10-{secrets.token_hex(3).upper()}"
+    promo_code = generate_promo_code()
 
-    inserted_id = create_subscription(email, promo_code)
+    # Pas de vérification préalable : l'index unique sur email rejette les doublons
+    try:
+        inserted_id = create_subscription(email, promo_code)
+    except ValueError:
+        # Ne pas créer de doublon, retourner code 409
+        raise HTTPException(status_code=409, detail="Email déjà abonné")
     if not inserted_id:
         raise HTTPException(status_code=500, detail="Erreur lors de l'enregistrement de l'abonnement")
 
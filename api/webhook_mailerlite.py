@@ -4,18 +4,103 @@ Reçoit les notifications de MailerLite quand un subscriber change de statut.
 """
 
 from fastapi import APIRouter, Request, HTTPException
-from typing import Dict, Any
+from starlette.concurrency import run_in_threadpool
+from typing import Any, Dict, List, Optional
+import hashlib
+import hmac
 import logging
 import os
 
+import orjson
+
 from app.repositories.subscriber_repo import subscriber_repo
 from app.models.subscriber import SubscriberStatus
+from app.utils.promo_codes import generate_promo_codes
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 # Secret pour valider les webhooks (optionnel mais recommandé)
 WEBHOOK_SECRET = os.getenv("MAILERLITE_WEBHOOK_SECRET", "")
+WEBHOOK_SECRET_BYTES = WEBHOOK_SECRET.encode()
+
+
+def is_valid_signature(raw_body: bytes, signature: Optional[str]) -> bool:
+    """Vérifie la signature HMAC-SHA256 (hex) du corps brut, en temps constant"""
+    if not signature:
+        return False
+    expected = hmac.new(WEBHOOK_SECRET_BYTES, raw_body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+
+def apply_webhook_events(events: List[Dict[str, Any]]) -> None:
+    """
+    Applique un lot d'événements MailerLite aux abonnés en base
+    (une lecture groupée, puis une écriture groupée).
+    """
+    # Récupérer en une seule requête tous les abonnés concernés par le lot d'événements
+    emails = [
+        event.get("data", {}).get("subscriber", {}).get("email")
+        for event in events
+    ]
+    subscribers = subscriber_repo.get_many_by_email(email for email in emails if email)
+    updates = []
+    # Index (dans updates) des confirmations qui attendent un code promo
+    need_promo = []
+    
+    for event, email in zip(events, emails):
+        event_type = event.get("type")
+        subscriber_data = event.get("data", {}).get("subscriber", {})
+        mailerlite_status = subscriber_data.get("status")
+    
+        if not email:
+            logger.warning("No email in webhook event: %s", event_type)
+            continue
+    
+        # Récupérer l'abonné dans notre DB
+        existing = subscribers.get(email.lower())
+    
+        if not existing:
+            logger.warning("Subscriber %s not found in DB, skipping webhook update", email)
+            continue
+    
+        # Mapper le statut MailerLite vers notre statut
+        fields = None
+        if event_type == "subscriber.double_opt_in" or mailerlite_status == "active":
+            # Le user a confirmé son email
+            if existing.get("status") != SubscriberStatus.CONFIRMED.value:
+                # Code promo existant, sinon généré en lot après la boucle
+                promo_code = existing.get("promo_code")
+                if not promo_code:
+                    need_promo.append(len(updates))
+    
+                fields = subscriber_repo.confirmation_fields(promo_code)
+                logger.debug("Subscriber confirmed via webhook: %s", email)
+    
+        elif event_type == "subscriber.unsubscribed" or mailerlite_status == "unsubscribed":
+            if existing.get("status") != SubscriberStatus.UNSUBSCRIBED.value:
+                fields = subscriber_repo.unsubscription_fields("Unsubscribed via MailerLite")
+                logger.debug("Subscriber unsubscribed via webhook: %s", email)
+    
+        elif event_type == "subscriber.bounced" or mailerlite_status == "bounced":
+            fields = {"status": SubscriberStatus.BOUNCED.value}
+            logger.debug("Subscriber bounced via webhook: %s", email)
+    
+        elif event_type == "subscriber.complaint" or mailerlite_status == "junk":
+            fields = {"status": SubscriberStatus.COMPLAINED.value}
+            logger.debug("Subscriber complained via webhook: %s", email)
+    
+        if fields:
+            updates.append((email, fields))
+            # Les événements suivants du même lot voient l'état à jour
+            existing.update(fields)
+    
+    # Un seul tirage aléatoire pour tous les codes promo manquants
+    for index, promo_code in zip(need_promo, generate_promo_codes(len(need_promo))):
+        updates[index][1]["promo_code"] = promo_code
+    
+    # Toutes les mises à jour en un seul aller-retour
+    subscriber_repo.update_many(updates)
 
 
 @router.post("/subscriber-updated")
@@ -46,68 +131,34 @@ async def mailerlite_webhook_subscriber_updated(request: Request):
         }]
     }
     """
+    raw_body = await request.body()
+    
+    # Valider la signature si un secret est configuré, avant tout parsing du corps
+    if WEBHOOK_SECRET:
+        signature = request.headers.get("Signature") or request.headers.get("X-MailerLite-Signature")
+        if not is_valid_signature(raw_body, signature):
+            logger.warning("Invalid webhook signature")
+            raise HTTPException(status_code=401, detail="Invalid signature")
+    
     try:
-        payload = await request.json()
-        logger.debug(f"Received MailerLite webhook: {payload}")
-        
-        # Valider le secret si configuré
-        if WEBHOOK_SECRET:
-            webhook_secret = request.headers.get("X-MailerLite-Signature")
-            if webhook_secret != WEBHOOK_SECRET:
-                logger.warning("Invalid webhook signature")
-                raise HTTPException(status_code=401, detail="Invalid signature")
+        payload = orjson.loads(raw_body)
+    except orjson.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Invalid JSON payload")
+    
+    try:
+        # Le corps brut est déjà du JSON : pas de repr() du dict, et rien à faire hors DEBUG
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Received MailerLite webhook: %s", raw_body.decode("utf-8", "replace"))
         
         events = payload.get("events", [])
         
-        for event in events:
-            event_type = event.get("type")
-            event_data = event.get("data", {})
-            subscriber_data = event_data.get("subscriber", {})
-            
-            email = subscriber_data.get("email")
-            mailerlite_status = subscriber_data.get("status")
-            
-            if not email:
-                logger.warning(f"No email in webhook event: {event_type}")
-                continue
-            
-            # Récupérer l'abonné dans notre DB
-            existing = subscriber_repo.get_by_email(email)
-            
-            if not existing:
-                logger.warning(f"Subscriber {email} not found in DB, skipping webhook update")
-                continue
-            
-            # Mapper le statut MailerLite vers notre statut
-            if event_type == "subscriber.double_opt_in" or mailerlite_status == "active":
-                # Le user a confirmé son email
-                if existing.get("status") != SubscriberStatus.CONFIRMED.value:
-                    # Générer un code promo si pas déjà fait
-                    promo_code = existing.get("promo_code")
-                    if not promo_code:
-                        import secrets
-                        promo_code = f"EC10-{secrets.token_hex(3).upper()}"
-                    
-                    subscriber_repo.confirm(email, promo_code)
-                    logger.debug(f"Subscriber confirmed via webhook: {email}")
-            
-            elif event_type == "subscriber.unsubscribed" or mailerlite_status == "unsubscribed":
-                if existing.get("status") != SubscriberStatus.UNSUBSCRIBED.value:
-                    subscriber_repo.unsubscribe(email, "Unsubscribed via MailerLite")
-                    logger.debug(f"Subscriber unsubscribed via webhook: {email}")
-            
-            elif event_type == "subscriber.bounced" or mailerlite_status == "bounced":
-                subscriber_repo.mark_bounced(email)
-                logger.debug(f"Subscriber bounced via webhook: {email}")
-            
-            elif event_type == "subscriber.complaint" or mailerlite_status == "junk":
-                subscriber_repo.mark_complained(email)
-                logger.debug(f"Subscriber complained via webhook: {email}")
+        # Accès MongoDB bloquants (pymongo) : exécutés dans le threadpool pour libérer la boucle
+        await run_in_threadpool(apply_webhook_events, events)
         
         return {"status": "success", "processed": len(events)}
     
     except Exception as e:
-        logger.error(f"Error processing MailerLite webhook: {e}")
+        logger.error("Error processing MailerLite webhook: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -4,4 +4,7 @@ from dotenv import load_dotenv
 load_dotenv()
 
 MONGO_URI = os.getenv("MONGO_URI")
-MONGO_DB = os.getenv("MONGO_DB")
+MONGO_DB = os.getenv("MONGO_DB", "site_maman")
+# Pool de connexions et compression réseau (zlib : aucune dépendance supplémentaire)
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "20"))
+MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS", "zlib")
@@ -4,13 +4,15 @@ CRUD operations for artwork_types collection.
 Architecture propre:
 - Pas de soft delete (suppression définitive uniquement)
 - Pas de fusion avec les types des artworks
-- Normalisation des noms pour comparaisons (via normalize_string)
+- Normalisation des noms pour comparaisons (via normalize_string, stockée dans normalized_name)
 - Source unique de vérité: la collection artwork_types
 """
 from typing import List, Optional
 from app.utils.string_utils import normalize_string
-from bson.objectid import ObjectId
-from app.database import get_database
+from app.utils.object_id import parse_object_id
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from app.database import get_database, has_unique_index
 
 
 def get_database_collection():
@@ -24,10 +26,11 @@ def get_all_artwork_types() -> List[dict]:
     Retourne tous les types d'œuvres depuis la collection artwork_types.
     
     Returns:
-        Liste de documents {_id, name, display_name}
+        Liste de documents {_id, name, normalized_name, display_name}
     """
     collection = get_database_collection()
-    return list(collection.find({}))
+    # Projection explicite : seuls les champs exposés sont rapatriés
+    return list(collection.find({}, {"name": 1, "normalized_name": 1, "display_name": 1}))
 
 
 def get_artwork_type_by_id(type_id: str) -> Optional[dict]:
@@ -40,9 +43,8 @@ def get_artwork_type_by_id(type_id: str) -> Optional[dict]:
     Returns:
         Le document du type ou None
     """
-    try:
-        oid = ObjectId(type_id)
-    except Exception:
+    oid = parse_object_id(type_id)
+    if oid is None:
         return None
     
     collection = get_database_collection()
@@ -66,13 +68,8 @@ def get_artwork_type_by_name(name: str, normalized: bool = True) -> Optional[dic
     collection = get_database_collection()
     
     if normalized:
-        # Recherche normalisée (tolérante)
-        normalized_search = normalize_string(name)
-        for type_doc in collection.find({}):
-            db_name = type_doc.get('name', '')
-            if normalize_string(db_name) == normalized_search:
-                return type_doc
-        return None
+        # Recherche normalisée (tolérante), via le champ indexé normalized_name
+        return collection.find_one({"normalized_name": normalize_string(name)})
     else:
         # Recherche stricte
         return collection.find_one({"name": name})
@@ -97,19 +94,22 @@ def create_artwork_type(name: str, display_name: Optional[str] = None) -> str:
     
     name = name.strip()
     
-    # Vérifier l'unicité (comparaison normalisée)
-    existing = get_artwork_type_by_name(name, normalized=True)
-    if existing:
-        raise ValueError(f"Le type '{name}' existe déjà (ou un équivalent normalisé)")
-    
     # Préparer le document
     doc = {
         "name": name,
+        "normalized_name": normalize_string(name),
         "display_name": display_name.strip() if display_name else name.capitalize()
     }
     
+    # Unicité (comparaison normalisée) garantie par l'index unique sur normalized_name ;
+    # contrôle applicatif tant que l'index n'a pas été créé (scripts/ensure_indexes.py)
     collection = get_database_collection()
-    result = collection.insert_one(doc)
+    if not has_unique_index(collection, "normalized_name") and get_artwork_type_by_name(name, normalized=True):
+        raise ValueError(f"Le type '{name}' existe déjà (ou un équivalent normalisé)")
+    try:
+        result = collection.insert_one(doc)
+    except DuplicateKeyError:
+        raise ValueError(f"Le type '{name}' existe déjà (ou un équivalent normalisé)")
     return str(result.inserted_id)
 
 
@@ -128,32 +128,18 @@ def update_artwork_type(type_id: str, name: Optional[str] = None, display_name:
     Raises:
         ValueError: Si le nouveau nom existe déjà
     """
-    try:
-        oid = ObjectId(type_id)
-    except Exception:
-        return False
-    
-    collection = get_database_collection()
-    
-    # Vérifier que le type existe
-    existing_type = collection.find_one({"_id": oid})
-    if not existing_type:
+    oid = parse_object_id(type_id)
+    if oid is None:
         return False
     
     update_fields = {}
     
-    # Si on change le nom, vérifier l'unicité
     if name is not None:
         name = name.strip()
         if not name:
             raise ValueError("Le nom du type ne peut pas être vide")
-        
-        # Vérifier que ce nom n'est pas déjà pris (sauf si c'est le même document)
-        name_conflict = get_artwork_type_by_name(name, normalized=True)
-        if name_conflict and str(name_conflict["_id"]) != type_id:
-            raise ValueError(f"Le type '{name}' existe déjà")
-        
         update_fields["name"] = name
+        update_fields["normalized_name"] = normalize_string(name)
     
     if display_name is not None:
         update_fields["display_name"] = display_name.strip() if display_name else ""
@@ -161,8 +147,26 @@ def update_artwork_type(type_id: str, name: Optional[str] = None, display_name:
     if not update_fields:
         return False
     
-    result = collection.update_one({"_id": oid}, {"$set": update_fields})
-    return result.modified_count > 0
+    # Une seule écriture : l'existence est vérifiée par le filtre,
+    # l'unicité du nom (normalisé) par l'index unique sur normalized_name
+    collection = get_database_collection()
+    if "normalized_name" in update_fields and not has_unique_index(collection, "normalized_name"):
+        # Index pas encore créé : contrôle applicatif des doublons
+        name_conflict = collection.find_one(
+            {"normalized_name": update_fields["normalized_name"], "_id": {"$ne": oid}},
+            {"_id": 1}
+        )
+        if name_conflict:
+            raise ValueError(f"Le type '{name}' existe déjà. Utilisez un nom différent.")
+    try:
+        updated = collection.find_one_and_update(
+            {"_id": oid},
+            {"$set": update_fields},
+            return_document=ReturnDocument.AFTER
+        )
+    except DuplicateKeyError:
+        raise ValueError(f"Le type '{name}' existe déjà. Utilisez un nom différent.")
+    return updated is not None
 
 
 def delete_artwork_type(type_id: str) -> bool:
@@ -175,9 +179,8 @@ def delete_artwork_type(type_id: str) -> bool:
     Returns:
         True si la suppression a réussi, False sinon
     """
-    try:
-        oid = ObjectId(type_id)
-    except Exception:
+    oid = parse_object_id(type_id)
+    if oid is None:
         return False
     
     collection = get_database_collection()
@@ -194,6 +197,6 @@ def get_artwork_types_names() -> List[str]:
         Liste triée des noms de types
     """
     collection = get_database_collection()
-    types_docs = list(collection.find({}, {"name": 1}))
-    names = [doc["name"] for doc in types_docs if "name" in doc]
-    return sorted(names)
+    # Tri fait par MongoDB (index sur name), sans rapatrier les _id
+    cursor = collection.find({}, {"_id": 0, "name": 1}).sort("name", ASCENDING)
+    return [doc["name"] for doc in cursor if "name" in doc]
@@ -1,23 +1,61 @@
 from typing import List, Optional
 from app.utils.string_utils import normalize_string
-from bson.objectid import ObjectId
+from app.utils.object_id import parse_object_id
+from app.utils.update_pipeline import build_update_pipeline
+from pymongo import ReturnDocument
 from app.database import artworks_collection
 
+__all__ = [
+    "get_all_artworks",
+    "get_artworks_by_normalized_type",
+    "get_artwork_by_id",
+    "create_artwork",
+    "update_artwork_returning",
+    "delete_artwork",
+    "update_artwork_type",
+]
+
 TRANSLATABLE_FIELDS = {"title", "description", "type", "status"}
 
-def get_all_artworks() -> List[dict]:
+def get_all_artworks(
+    skip: int = 0,
+    limit: int = 0,
+    projection: Optional[dict] = None,
+    batch_size: int = 1000
+) -> List[dict]:
+    """
+    Renvoie la liste des œuvres, paginée côté serveur si limit > 0 (0 = toutes).
+    projection permet de ne récupérer que les champs nécessaires ; batch_size limite
+    le nombre d'allers-retours getMore pour les grandes listes.
+    """
+    return list(artworks_collection.find({}, projection, batch_size=batch_size).skip(skip).limit(limit))
+
+def get_artworks_by_normalized_type(normalized_type: str, batch_size: int = 1000) -> List[dict]:
     """
-    Renvoie la liste de toutes les œuvres.
+    Renvoie les œuvres dont le type, une fois normalisé, vaut normalized_type.
+    S'appuie sur le champ dénormalisé type_norm (indexé).
     """
-    return list(artworks_collection.find())
+    return list(artworks_collection.find(normalized_type_filter(normalized_type), batch_size=batch_size))
+
+def normalized_type_filter(normalized_type: str) -> dict:
+    """
+    Filtre sur type_norm ; le $type explicite permet au planificateur d'utiliser
+    l'index partiel (limité aux types renseignés).
+    """
+    return {"type_norm": {"$eq": normalized_type, "$type": "string"}}
+
+def normalized_type_value(artwork_type: Optional[str]) -> Optional[str]:
+    """
+    Valeur du champ type_norm pour un type donné (None si l'œuvre n'a pas de type).
+    """
+    return normalize_string(artwork_type) if artwork_type else None
 
 def get_artwork_by_id(artwork_id: str) -> Optional[dict]:
     """
     Renvoie une seule œuvre correspondant à l'_id MongoDB.
     """
-    try:
-        oid = ObjectId(artwork_id)
-    except Exception:
+    oid = parse_object_id(artwork_id)
+    if oid is None:
         return None
     return artworks_collection.find_one({"_id": oid})
 
@@ -28,65 +66,42 @@ def create_artwork(data: dict) -> str:
     """
     data = dict(data)
     data.pop("_id", None)
+    data["type_norm"] = normalized_type_value(data.get("type"))
     result = artworks_collection.insert_one(data)
     return str(result.inserted_id)
 
-def update_artwork(artwork_id: str, update_data: dict) -> int:
+def update_artwork_returning(artwork_id: str, update_data: dict) -> Optional[dict]:
     """
-    Met à jour l'œuvre au _id donné avec les champs de update_data.
-    Retourne le nombre de documents modifiés (0 ou 1).
+    Met à jour l'œuvre au _id donné avec les champs de update_data et renvoie le document
+    à jour, en un seul aller-retour. Renvoie None si l'œuvre n'existe pas.
     """
-    try:
-        oid = ObjectId(artwork_id)
-    except Exception as e:
-        return 0
+    oid = parse_object_id(artwork_id)
+    if oid is None:
+        return None
     
     update_data = dict(update_data)
     update_data.pop("_id", None)
+    if not update_data:
+        return get_artwork_by_id(artwork_id)
+    if "type" in update_data:
+        update_data["type_norm"] = normalized_type_value(update_data["type"])
     
-    # Vérifier si l'artwork existe
-    existing = artworks_collection.find_one({"_id": oid})
-    if not existing:
-        return 0
-    
-    # Comparer les données pour voir s'il y a vraiment des changements
-    has_changes = False
-    changed_fields = []
-    for key, new_value in update_data.items():
-        existing_value = existing.get(key)
-        if existing_value != new_value:
-            has_changes = True
-            changed_fields.append(key)
-    
-    # Si aucun changement, retourner 0 sans faire de requête DB
-    if not has_changes:
-        return 0
-    
-    update_payload = {"$set": update_data}
-
-    translations = existing.get("translations", {})
-    unset_fields = {}
-    if translations.get("en"):
-        for field in changed_fields:
-            if field in TRANSLATABLE_FIELDS:
-                unset_fields[f"translations.en.{field}"] = ""
-    if unset_fields:
-        update_payload["$unset"] = unset_fields
-
-    result = artworks_collection.update_one(
+    # Écriture atomique : nouvelles valeurs et invalidation des traductions anglaises
+    # des champs traduisibles modifiés. Des données identiques ne modifient pas le document.
+    pipeline, _ = build_update_pipeline(update_data, TRANSLATABLE_FIELDS)
+    return artworks_collection.find_one_and_update(
         {"_id": oid},
-        update_payload
+        pipeline,
+        return_document=ReturnDocument.AFTER
     )
-    return result.modified_count
 
 def delete_artwork(artwork_id: str) -> int:
     """
     Supprime l'œuvre au _id donné.
     Retourne le nombre de documents supprimés (0 ou 1).
     """
-    try:
-        oid = ObjectId(artwork_id)
-    except Exception:
+    oid = parse_object_id(artwork_id)
+    if oid is None:
         return 0
     result = artworks_collection.delete_one({"_id": oid})
     return result.deleted_count
@@ -97,35 +112,12 @@ def update_artwork_type(old_type: str, new_type: Optional[str]) -> int:
     Si new_type est None, met le champ à null (non défini).
     Retourne le nombre de documents modifiés.
     """
-    
     try:
-        # On normalise les comparaisons : parcourir les œuvres et matcher via normalize_string
-        all_artworks = list(artworks_collection.find({}))
-        to_update_ids = []
-        for aw in all_artworks:
-            aw_type = aw.get('type')
-            if aw_type is None:
-                continue
-            if normalize_string(aw_type) == normalize_string(old_type):
-                to_update_ids.append(aw.get('_id'))
-
-        if not to_update_ids:
-            return 0
-
-        from bson import ObjectId
-        object_ids = [ObjectId(i) if not isinstance(i, ObjectId) else i for i in to_update_ids]
-
-        if new_type is None:
-            result = artworks_collection.update_many(
-                {"_id": {"$in": object_ids}},
-                {"$set": {"type": None}}
-            )
-        else:
-            result = artworks_collection.update_many(
-                {"_id": {"$in": object_ids}},
-                {"$set": {"type": new_type}}
-            )
-
+        # Filtrage côté serveur sur le champ dénormalisé type_norm : une seule requête
+        result = artworks_collection.update_many(
+            normalized_type_filter(normalize_string(old_type)),
+            {"$set": {"type": new_type, "type_norm": normalized_type_value(new_type)}}
+        )
         return result.modified_count
 
     except Exception:
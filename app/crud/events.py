@@ -1,22 +1,37 @@
-from typing import List, Optional
-from bson.objectid import ObjectId
+from typing import Iterator, Optional, Tuple
+from datetime import datetime
+from app.utils.object_id import parse_object_id
+from app.utils.update_pipeline import build_update_pipeline
+from pymongo import DESCENDING, ReturnDocument
 from app.database import events_collection
 
 TRANSLATABLE_FIELDS = {"title", "description", "location", "status"}
 
-def get_all_events() -> List[dict]:
+def iter_all_events(batch_size: int = 500) -> Iterator[dict]:
     """
-    Renvoie la liste de tous les événements.
+    Parcourt tous les événements via le curseur MongoDB, sans charger la liste en mémoire.
     """
-    return list(events_collection.find())
+    return events_collection.find(batch_size=batch_size)
+
+def get_events_fingerprint() -> Tuple[int, Optional[datetime]]:
+    """
+    Renvoie une empreinte peu coûteuse de la collection : (nombre d'événements, dernier updated_at).
+    Toute création, modification ou suppression change l'empreinte.
+    """
+    count = events_collection.estimated_document_count()
+    latest = events_collection.find_one(
+        {"updated_at": {"$exists": True}},
+        {"_id": 0, "updated_at": 1},
+        sort=[("updated_at", DESCENDING)],
+    )
+    return count, latest.get("updated_at") if latest else None
 
 def get_event_by_id(event_id: str) -> Optional[dict]:
     """
     Renvoie un seul événement correspondant à l'_id MongoDB.
     """
-    try:
-        oid = ObjectId(event_id)
-    except Exception:
+    oid = parse_object_id(event_id)
+    if oid is None:
         return None
     return events_collection.find_one({"_id": oid})
 
@@ -27,64 +42,51 @@ def create_event(data: dict) -> str:
     """
     data = dict(data)
     data.pop("_id", None)
+    data["updated_at"] = datetime.utcnow()
     result = events_collection.insert_one(data)
     return str(result.inserted_id)
 
-def update_event(event_id: str, update_data: dict) -> int:
+def update_event_returning(event_id: str, update_data: dict) -> Tuple[Optional[dict], bool]:
     """
-    Met à jour l'événement au _id donné avec les champs de update_data.
-    Retourne le nombre de documents modifiés (0 ou 1).
+    Met à jour l'événement au _id donné et renvoie (document à jour, modifié ?) en un seul
+    aller-retour. Le document vaut None si l'événement n'existe pas ; modifié vaut False
+    si les données sont identiques (rien n'est alors écrit).
     """
-    try:
-        oid = ObjectId(event_id)
-    except Exception:
-        return 0
+    oid = parse_object_id(event_id)
+    if oid is None:
+        return None, False
     
     update_data = dict(update_data)
     update_data.pop("_id", None)
+    if not update_data:
+        return get_event_by_id(event_id), False
     
-    # Vérifier si l'événement existe
-    existing = events_collection.find_one({"_id": oid})
-    if not existing:
-        return 0
-    
-    # Comparer les données pour voir s'il y a vraiment des changements
-    has_changes = False
-    changed_fields = []
-    for key, new_value in update_data.items():
-        existing_value = existing.get(key)
-        if existing_value != new_value:
-            has_changes = True
-            changed_fields.append(key)
+    # Horodatage tronqué à la milliseconde (précision des dates BSON) : l'updated_at renvoyé
+    # vaut exactement `now` si cette écriture a modifié l'événement (un événement inchangé
+    # n'est confondu que s'il a été écrit dans la même milliseconde)
+    now = datetime.utcnow()
+    now = now.replace(microsecond=now.microsecond // 1000 * 1000)
     
-    # Si aucun changement, retourner 0 sans faire de requête DB
-    if not has_changes:
-        return 0
-    
-    update_payload = {"$set": update_data}
-    translations = existing.get("translations", {})
-    unset_fields = {}
-    if translations.get("en"):
-        for field in changed_fields:
-            if field in TRANSLATABLE_FIELDS:
-                unset_fields[f"translations.en.{field}"] = ""
-    if unset_fields:
-        update_payload["$unset"] = unset_fields
-
-    result = events_collection.update_one(
+    # Écriture atomique : nouvelles valeurs, invalidation des traductions anglaises des
+    # champs modifiés et updated_at (seulement si un champ change)
+    pipeline, any_changed = build_update_pipeline(update_data, TRANSLATABLE_FIELDS)
+    pipeline[0]["$set"]["updated_at"] = {"$cond": [any_changed, {"$literal": now}, "$updated_at"]}
+    updated = events_collection.find_one_and_update(
         {"_id": oid},
-        update_payload
+        pipeline,
+        return_document=ReturnDocument.AFTER
     )
-    return result.modified_count
+    if updated is None:
+        return None, False
+    return updated, updated.get("updated_at") == now
 
 def delete_event(event_id: str) -> int:
     """
     Supprime l'événement au _id donné.
     Retourne le nombre de documents supprimés (0 ou 1).
     """
-    try:
-        oid = ObjectId(event_id)
-    except Exception:
+    oid = parse_object_id(event_id)
+    if oid is None:
         return 0
     result = events_collection.delete_one({"_id": oid})
     return result.deleted_count
@@ -1,6 +1,5 @@
-from typing import List, Optional
-from datetime import datetime
-from bson.objectid import ObjectId
+from typing import Iterator, List, Optional
+from app.utils.object_id import parse_object_id
 from app.database import orders_collection
 
 def create_order(order_data: dict) -> str:
@@ -17,9 +16,8 @@ def get_order_by_id(order_id: str) -> Optional[dict]:
     """
     Renvoie une commande correspondant à l'_id MongoDB.
     """
-    try:
-        oid = ObjectId(order_id)
-    except Exception:
+    oid = parse_object_id(order_id)
+    if oid is None:
         return None
     return orders_collection.find_one({"_id": oid})
 
@@ -33,23 +31,34 @@ def update_order_status(order_id: str, status: str, stripe_payment_intent_id: st
     """
     Met à jour le statut d'une commande et optionnellement l'ID de paiement Stripe.
     """
-    try:
-        oid = ObjectId(order_id)
-    except Exception:
+    oid = parse_object_id(order_id)
+    if oid is None:
         return 0
     
-    update_data = {"status": status, "updated_at": datetime.now()}
+    update_data = {"status": status}
     if stripe_payment_intent_id:
         update_data["stripe_payment_intent_id"] = stripe_payment_intent_id
     
+    # updated_at horodaté par le serveur MongoDB au moment de l'écriture
     result = orders_collection.update_one(
         {"_id": oid},
-        {"$set": update_data}
+        {"$set": update_data, "$currentDate": {"updated_at": True}}
     )
     return result.modified_count
 
-def get_all_orders() -> List[dict]:
+def iter_all_orders(
+    batch_size: int = 500,
+    skip: int = 0,
+    limit: int = 0,
+    projection: Optional[dict] = None
+) -> Iterator[dict]:
     """
-    Renvoie toutes les commandes (pour l'admin).
+    Parcourt les commandes (plus récentes d'abord) via le curseur MongoDB.
+    Pagination côté serveur si limit > 0 (0 = toutes).
     """
-    return list(orders_collection.find().sort("created_at", -1))
+    return (
+        orders_collection.find({}, projection, batch_size=batch_size)
+        .sort("created_at", -1)
+        .skip(skip)
+        .limit(limit)
+    )
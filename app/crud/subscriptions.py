@@ -1,25 +1,31 @@
 from typing import Optional
 from datetime import datetime
-from app.database import subscribers_collection
-
-
-def get_subscription_by_email(email: str) -> Optional[dict]:
-    """Retourne l'abonnement correspondant à l'email (ou None)."""
-    if subscribers_collection is None:
-        return None
-    return subscribers_collection.find_one({"email": email.lower()})
+from pymongo.errors import DuplicateKeyError
+from app.database import subscribers_collection, has_unique_index
 
 
 def create_subscription(email: str, promo_code: str) -> Optional[str]:
-    """Insère un nouvel abonnement et retourne l'id inséré sous forme de string."""
+    """
+    Insère un nouvel abonnement et retourne l'id inséré sous forme de string.
+    L'email doit être déjà normalisé (minuscules).
+
+    Raises:
+        ValueError: Si l'email est déjà abonné (index unique sur email)
+    """
     if subscribers_collection is None:
         return None
     payload = {
-        "email": email.lower(),
+        "email": email,
         "promo_code": promo_code,
         "created_at": datetime.utcnow()
     }
-    result = subscribers_collection.insert_one(payload)
+    # Contrôle applicatif tant que l'index unique sur email n'a pas été créé (scripts/ensure_indexes.py)
+    if not has_unique_index(subscribers_collection, "email") and subscribers_collection.find_one({"email": email}, {"_id": 1}):
+        raise ValueError(f"Email déjà abonné : {email}")
+    try:
+        result = subscribers_collection.insert_one(payload)
+    except DuplicateKeyError:
+        raise ValueError(f"Email déjà abonné : {email}")
     return str(result.inserted_id)
 
 
@@ -1,21 +1,23 @@
-from dotenv import load_dotenv
-import os
-from pymongo import MongoClient
-import sys
+from pymongo import MongoClient, ASCENDING, DESCENDING
+import logging
+from app.config import MONGO_URI, MONGO_DB as DB_NAME, MONGO_MAX_POOL_SIZE, MONGO_COMPRESSORS
 
-load_dotenv()
-
-MONGO_URI = os.getenv("MONGO_URI")
-DB_NAME   = os.getenv("MONGO_DB", "site_maman")
+logger = logging.getLogger(__name__)
 
 if not MONGO_URI:
-    print("⚠️ ERROR: MONGO_URI environment variable not set!", file=sys.stderr)
-    print("⚠️ Backend will not work without MongoDB connection.", file=sys.stderr)
+    logger.error("⚠️ MONGO_URI environment variable not set!")
+    logger.error("⚠️ Backend will not work without MongoDB connection.")
     # Pour éviter le crash complet, on met une URI dummy (mais ça ne fonctionnera pas)
     MONGO_URI = "mongodb://localhost:27017/"
 
 try:
-    client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000)
+    # Client unique pour toute l'application (un seul pool de connexions)
+    client = MongoClient(
+        MONGO_URI,
+        serverSelectionTimeoutMS=5000,
+        maxPoolSize=MONGO_MAX_POOL_SIZE,
+        compressors=MONGO_COMPRESSORS
+    )
     # Test de connexion
     client.server_info()
     db = client[DB_NAME]
@@ -25,9 +27,9 @@ try:
     artwork_types_collection = db["artwork_types"]
     # Collection pour les abonnés à la newsletter
     subscribers_collection = db["subscribers"]
-    print("✅ MongoDB connected successfully")
+    logger.info("✅ MongoDB connected successfully")
 except Exception as e:
-    print(f"❌ MongoDB connection failed: {e}", file=sys.stderr)
+    logger.error("❌ MongoDB connection failed: %s", e)
     # Créer des collections dummy pour éviter le crash
     db = None
     artworks_collection = None
@@ -36,6 +38,68 @@ except Exception as e:
     artwork_types_collection = None
     subscribers_collection = None
 
+def ensure_indexes():
+    """
+    Crée les index utilisés par les requêtes chaudes (idempotent).
+    Lancé une fois au déploiement (scripts/ensure_indexes.py), jamais à l'import :
+    chaque démarrage à froid paierait sinon les allers-retours create_index.
+    """
+    if db is None:
+        return
+    index_specs = [
+        (events_collection, [("updated_at", DESCENDING)], {}),
+        # Commandes d'un acheteur (/api/orders/by-email)
+        (orders_collection, [("buyer_info.email", ASCENDING)], {}),
+        # Un PaymentIntent Stripe ne correspond qu'à une commande
+        (orders_collection, [("stripe_payment_intent_id", ASCENDING)], {
+            "unique": True,
+            "partialFilterExpression": {"stripe_payment_intent_id": {"$type": "string"}},
+        }),
+        # Liste complète des commandes triée par date (tri servi par l'index)
+        (orders_collection, [("created_at", DESCENDING)], {}),
+        # Listes admin filtrées par statut et triées par date
+        (orders_collection, [("status", ASCENDING), ("created_at", DESCENDING)], {}),
+        # Recherche et unicité des types d'œuvres par nom normalisé
+        (artwork_types_collection, [("normalized_name", ASCENDING)], {"unique": True}),
+        # Liste des noms de types triée côté serveur
+        (artwork_types_collection, [("name", ASCENDING)], {}),
+        # Recherche et unicité des abonnés par email (stocké en minuscules)
+        (subscribers_collection, [("email", ASCENDING)], {"unique": True}),
+        # Filtrage et renommage des œuvres par type normalisé (œuvres sans type exclues de l'index)
+        (artworks_collection, [("type_norm", ASCENDING)], {
+            "partialFilterExpression": {"type_norm": {"$type": "string"}},
+        }),
+    ]
+    # Chaque index est créé indépendamment : un échec n'empêche pas les suivants
+    for collection, keys, options in index_specs:
+        try:
+            collection.create_index(keys, **options)
+        except Exception as e:
+            logger.warning("⚠️ Index creation failed on %s %s: %s", collection.name, keys, e)
+
+# Index uniques dont l'existence a été vérifiée par ce processus : {(collection, champ)}
+_confirmed_unique_indexes = set()
+
+def has_unique_index(collection, field: str) -> bool:
+    """
+    Indique si un index unique existe sur field (créé par scripts/ensure_indexes.py).
+    Seul un résultat positif est mémorisé : tant que l'index manque, chaque appel revérifie,
+    et les écritures gardent leur contrôle de doublon applicatif.
+    """
+    if collection is None:
+        return False
+    key = (collection.name, field)
+    if key in _confirmed_unique_indexes:
+        return True
+    try:
+        for index in collection.list_indexes():
+            if index.get("unique") and list(index["key"].keys()) == [field]:
+                _confirmed_unique_indexes.add(key)
+                return True
+    except Exception as e:
+        logger.warning("⚠️ Index lookup failed on %s: %s", collection.name, e)
+    return False
+
 def get_database():
     """Retourne l'instance de la base de données MongoDB"""
     if db is None:
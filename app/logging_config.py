@@ -0,0 +1,38 @@
+"""
+Configuration du logging de l'application.
+Les handlers des loggers ne font qu'empiler les enregistrements dans une file ;
+le formatage et l'écriture sur stderr se font dans un thread dédié.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import queue
+from typing import Optional
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def setup_logging(level: int = logging.INFO) -> None:
+    """
+    Installe un QueueHandler sur le logger racine et démarre le QueueListener associé.
+    Idempotent : les appels suivants ne font rien.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue = queue.Queue(-1)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    root = logging.getLogger()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    # Vider la file à l'arrêt du process (pas de hook lifespan garanti sur Vercel)
+    atexit.register(_listener.stop)
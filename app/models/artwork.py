@@ -11,7 +11,7 @@ class Artwork(BaseModel):
     title: str
     description: Optional[str] = None
     main_image: str
-    other_images: Optional[List[str]] = []
+    other_images: Optional[List[str]] = Field(default_factory=list)
     price: float
     width: float  # en cm
     height: float  # en cm
@@ -14,5 +14,6 @@ class CreateArtworkTypeRequest(BaseModel):
     display_name: Optional[str] = None
 
 class UpdateArtworkTypeRequest(BaseModel):
+    newType: str
     display_name: Optional[str] = None
     # is_active removed
@@ -9,6 +9,7 @@ class OrderStatus(str, Enum):
     SHIPPED = "shipped"
     DELIVERED = "delivered"
     CANCELLED = "cancelled"
+    FAILED = "failed"  # Paiement non abouti (peut encore passer à "paid")
 
 class OrderItem(BaseModel):
     artwork_id: str
@@ -3,10 +3,12 @@ Repository pour la gestion des abonnés à la newsletter.
 CRUD complet avec gestion RGPD et statistiques.
 """
 
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Iterable, Tuple
 from datetime import datetime
 from bson import ObjectId
-from app.database import subscribers_collection
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+from app.database import subscribers_collection, has_unique_index
 from app.models.subscriber import SubscriberStatus, SubscriberSource
 import logging
 
@@ -25,6 +27,15 @@ class SubscriberRepository:
             return None
         return self.collection.find_one({"email": email.lower()})
     
+    def get_many_by_email(self, emails: Iterable[str]) -> Dict[str, Dict]:
+        """Récupère plusieurs abonnés en une requête, indexés par email"""
+        if self.collection is None:
+            return {}
+        normalized = list({email.lower() for email in emails})
+        if not normalized:
+            return {}
+        return {doc["email"]: doc for doc in self.collection.find({"email": {"$in": normalized}})}
+    
     def get_by_id(self, subscriber_id: str) -> Optional[Dict]:
         """Récupère un abonné par son ID"""
         if self.collection is None:
@@ -52,19 +63,21 @@ class SubscriberRepository:
             # Normaliser l'email
             subscriber_data["email"] = subscriber_data["email"].lower()
             
-            # Vérifier que l'email n'existe pas déjà
-            existing = self.get_by_email(subscriber_data["email"])
-            if existing:
-                logger.warning(f"Subscriber already exists: {subscriber_data['email']}")
-                return None
-            
             # Ajouter timestamp
             subscriber_data["created_at"] = datetime.utcnow()
             
+            # Pas de lecture préalable : l'index unique sur email rejette les doublons
+            # (contrôle applicatif tant que l'index n'a pas été créé par scripts/ensure_indexes.py)
+            if not has_unique_index(self.collection, "email") and self.get_by_email(subscriber_data["email"]):
+                logger.warning(f"Subscriber already exists: {subscriber_data['email']}")
+                return None
             result = self.collection.insert_one(subscriber_data)
             logger.info(f"✅ Subscriber created: {subscriber_data['email']}")
             return str(result.inserted_id)
             
+        except DuplicateKeyError:
+            logger.warning(f"Subscriber already exists: {subscriber_data['email']}")
+            return None
         except Exception as e:
             logger.error(f"Error creating subscriber: {e}")
             return None
@@ -93,6 +106,46 @@ class SubscriberRepository:
             logger.error(f"Error updating subscriber: {e}")
             return False
     
+    def update_many(self, updates: List[Tuple[str, Dict]]) -> int:
+        """
+        Applique plusieurs mises à jour (email, champs) en un seul bulk_write.
+        L'ordre est conservé : plusieurs mises à jour du même email s'appliquent dans l'ordre.
+        
+        Returns:
+            Nombre de documents modifiés
+        """
+        if self.collection is None or not updates:
+            return 0
+        
+        try:
+            result = self.collection.bulk_write(
+                [UpdateOne({"email": email.lower()}, {"$set": fields}) for email, fields in updates]
+            )
+            return result.modified_count
+        except Exception as e:
+            logger.error(f"Error bulk updating subscribers: {e}")
+            return 0
+    
+    @staticmethod
+    def confirmation_fields(promo_code: str) -> Dict:
+        """Champs à écrire pour confirmer un abonné"""
+        return {
+            "status": SubscriberStatus.CONFIRMED.value,
+            "confirmed_at": datetime.utcnow(),
+            "promo_code": promo_code
+        }
+    
+    @staticmethod
+    def unsubscription_fields(reason: Optional[str] = None) -> Dict:
+        """Champs à écrire pour désinscrire un abonné"""
+        update_data = {
+            "status": SubscriberStatus.UNSUBSCRIBED.value,
+            "unsubscribed_at": datetime.utcnow()
+        }
+        if reason:
+            update_data["unsubscribe_reason"] = reason
+        return update_data
+    
     def confirm(self, email: str, promo_code: str) -> bool:
         """
         Confirme un abonné (double opt-in validé).
@@ -104,11 +157,7 @@ class SubscriberRepository:
         Returns:
             True si confirmation réussie, False sinon
         """
-        update_data = {
-            "status": SubscriberStatus.CONFIRMED.value,
-            "confirmed_at": datetime.utcnow(),
-            "promo_code": promo_code
-        }
+        update_data = self.confirmation_fields(promo_code)
         
         success = self.update(email, update_data)
         if success:
@@ -126,13 +175,7 @@ class SubscriberRepository:
         Returns:
             True si désinscription réussie, False sinon
         """
-        update_data = {
-            "status": SubscriberStatus.UNSUBSCRIBED.value,
-            "unsubscribed_at": datetime.utcnow()
-        }
-        
-        if reason:
-            update_data["unsubscribe_reason"] = reason
+        update_data = self.unsubscription_fields(reason)
         
         success = self.update(email, update_data)
         if success:
@@ -153,6 +196,26 @@ class SubscriberRepository:
         }
         return self.update(email, update_data)
     
+    @staticmethod
+    def email_stats_update(sent: bool = False, opened: bool = False, clicked: bool = False) -> Dict:
+        """Opération de mise à jour des statistiques d'emails (vide si rien à incrémenter)"""
+        inc = {}
+        set_ = {}
+        if sent:
+            inc["emails_sent"] = 1
+            set_["last_email_sent_at"] = datetime.utcnow()
+        if opened:
+            inc["emails_opened"] = 1
+        if clicked:
+            inc["emails_clicked"] = 1
+        
+        update = {}
+        if inc:
+            update["$inc"] = inc
+        if set_:
+            update["$set"] = set_
+        return update
+    
     def increment_email_stats(
         self,
         email: str,
@@ -176,16 +239,7 @@ class SubscriberRepository:
             return False
         
         try:
-            update = {}
-            if sent:
-                update["$inc"] = {"emails_sent": 1}
-                update["$set"] = {"last_email_sent_at": datetime.utcnow()}
-            if opened:
-                update["$inc"] = update.get("$inc", {})
-                update["$inc"]["emails_opened"] = 1
-            if clicked:
-                update["$inc"] = update.get("$inc", {})
-                update["$inc"]["emails_clicked"] = 1
+            update = self.email_stats_update(sent, opened, clicked)
             
             if update:
                 result = self.collection.update_one(
@@ -199,9 +253,44 @@ class SubscriberRepository:
             logger.error(f"Error updating email stats: {e}")
             return False
     
-    def get_active_subscribers(self) -> List[Dict]:
+    def increment_active_subscribers_email_stats(
+        self,
+        sent: bool = False,
+        opened: bool = False,
+        clicked: bool = False
+    ) -> int:
+        """
+        Incrémente les statistiques d'emails de tous les abonnés actifs en une seule requête
+        (même incrément pour tous, ex: envoi d'une newsletter).
+        
+        Returns:
+            Nombre d'abonnés mis à jour
+        """
+        if self.collection is None:
+            return 0
+        
+        update = self.email_stats_update(sent, opened, clicked)
+        if not update:
+            return 0
+        
+        try:
+            result = self.collection.update_many(
+                {"status": SubscriberStatus.CONFIRMED.value},
+                update
+            )
+            return result.modified_count
+        except Exception as e:
+            logger.error(f"Error bulk updating email stats: {e}")
+            return 0
+    
+    def get_active_subscribers(self, projection: Optional[Dict] = None) -> List[Dict]:
         """
         Récupère tous les abonnés actifs (confirmés et non désinscrits).
+        Les documents sont renvoyés tels quels (dicts), sans validation Pydantic :
+        ils proviennent de notre base et ont été validés à l'inscription.
+        
+        Args:
+            projection: Champs à récupérer (tous par défaut)
         
         Returns:
             Liste des abonnés actifs
@@ -210,9 +299,10 @@ class SubscriberRepository:
             return []
         
         try:
-            subscribers = list(self.collection.find({
-                "status": SubscriberStatus.CONFIRMED.value
-            }))
+            subscribers = list(self.collection.find(
+                {"status": SubscriberStatus.CONFIRMED.value},
+                projection
+            ))
             return subscribers
         except Exception as e:
             logger.error(f"Error getting active subscribers: {e}")
@@ -229,6 +319,13 @@ class SubscriberRepository:
             logger.error(f"Error getting all subscribers: {e}")
             return []
     
+    @staticmethod
+    def empty_stats() -> Dict:
+        """Statistiques à zéro : total + un compteur par statut"""
+        stats = {"total": 0}
+        stats.update({status.value: 0 for status in SubscriberStatus})
+        return stats
+    
     def get_stats(self) -> Dict:
         """
         Récupère les statistiques des abonnés.
@@ -236,15 +333,9 @@ class SubscriberRepository:
         Returns:
             Dictionnaire avec les statistiques
         """
+        stats = self.empty_stats()
         if self.collection is None:
-            return {
-                "total": 0,
-                "confirmed": 0,
-                "pending": 0,
-                "unsubscribed": 0,
-                "bounced": 0,
-                "complained": 0
-            }
+            return stats
         
         try:
             pipeline = [
@@ -256,44 +347,18 @@ class SubscriberRepository:
                 }
             ]
             
-            results = list(self.collection.aggregate(pipeline))
-            
-            stats = {
-                "total": sum(r["count"] for r in results),
-                "confirmed": 0,
-                "pending": 0,
-                "unsubscribed": 0,
-                "bounced": 0,
-                "complained": 0
-            }
-            
-            for result in results:
-                status = result["_id"]
-                count = result["count"]
-                
-                if status == SubscriberStatus.CONFIRMED.value:
-                    stats["confirmed"] = count
-                elif status == SubscriberStatus.PENDING.value:
-                    stats["pending"] = count
-                elif status == SubscriberStatus.UNSUBSCRIBED.value:
-                    stats["unsubscribed"] = count
-                elif status == SubscriberStatus.BOUNCED.value:
-                    stats["bounced"] = count
-                elif status == SubscriberStatus.COMPLAINED.value:
-                    stats["complained"] = count
+            for result in self.collection.aggregate(pipeline):
+                status, count = result["_id"], result["count"]
+                stats["total"] += count
+                # Les clés de sortie sont les valeurs de SubscriberStatus ; statuts inconnus comptés dans total
+                if status in stats and status != "total":
+                    stats[status] = count
             
             return stats
             
         except Exception as e:
             logger.error(f"Error getting subscriber stats: {e}")
-            return {
-                "total": 0,
-                "confirmed": 0,
-                "pending": 0,
-                "unsubscribed": 0,
-                "bounced": 0,
-                "complained": 0
-            }
+            return self.empty_stats()
     
     def delete(self, email: str) -> bool:
         """
@@ -7,7 +7,6 @@ from fastapi import APIRouter, HTTPException, Request, Query
 from fastapi.responses import RedirectResponse, JSONResponse
 from pydantic import BaseModel, EmailStr
 from typing import Optional
-import secrets
 import os
 import logging
 
@@ -30,6 +29,7 @@ from app.services.email.mailerlite_client import (
     mark_subscriber_confirmed,
     mark_subscriber_unsubscribed,
 )
+from app.utils.promo_codes import generate_promo_code
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -40,7 +40,7 @@ FRONTEND_URL = _FRONTEND_RAW.split(",")[0].strip() if _FRONTEND_RAW else "http:/
 
 
 @router.post("/subscribe", response_model=dict)
-async def subscribe_to_newsletter(request: SubscribeRequest, req: Request):
+def subscribe_to_newsletter(request: SubscribeRequest, req: Request):
     """
     Endpoint d'inscription à la newsletter avec double opt-in.
     
@@ -136,11 +136,11 @@ async def subscribe_to_newsletter(request: SubscribeRequest, req: Request):
     mailerlite_result = ensure_newsletter_subscriber(email=email)
     
     if not mailerlite_result:
-        logger.warning(f"Failed to add subscriber to MailerLite: {email}")
+        logger.warning("Failed to add subscriber to MailerLite: %s", email)
     else:
-        logger.debug(f"Subscriber added to MailerLite with double opt-in: {email}")
+        logger.debug("Subscriber added to MailerLite with double opt-in: %s", email)
     
-    logger.debug(f"New subscriber (pending confirmation): {email}")
+    logger.debug("New subscriber (pending confirmation): %s", email)
     
     return {
         "message": "Email de vérification envoyé.",
@@ -151,7 +151,7 @@ async def subscribe_to_newsletter(request: SubscribeRequest, req: Request):
 
 
 @router.get("/confirm")
-async def confirm_subscription(token: str = Query(..., description="Token JWT de confirmation")):
+def confirm_subscription(token: str = Query(..., description="Token JWT de confirmation")):
     """
     Endpoint de confirmation d'inscription (double opt-in).
     
@@ -197,7 +197,7 @@ async def confirm_subscription(token: str = Query(..., description="Token JWT de
         )
     
     # Générer un code promo
-    promo_code = f"EC10-{secrets.token_hex(3).upper()}"
+    promo_code = generate_promo_code()
     
     # Confirmer l'abonné
     success = subscriber_repo.confirm(email, promo_code)
@@ -211,7 +211,7 @@ async def confirm_subscription(token: str = Query(..., description="Token JWT de
     # Marquer l'abonné comme actif dans MailerLite
     mark_subscriber_confirmed(email)
     
-    logger.debug(f"Subscriber confirmed: {email} - Promo: {promo_code}")
+    logger.debug("Subscriber confirmed: %s - Promo: %s", email, promo_code)
     
     # Rediriger vers la page de confirmation avec le code promo
     return RedirectResponse(
@@ -221,7 +221,7 @@ async def confirm_subscription(token: str = Query(..., description="Token JWT de
 
 
 @router.post("/unsubscribe", response_model=dict)
-async def unsubscribe_from_newsletter(request: UnsubscribeRequest):
+def unsubscribe_from_newsletter(request: UnsubscribeRequest):
     """
     Endpoint de désinscription de la newsletter.
     
@@ -261,7 +261,7 @@ async def unsubscribe_from_newsletter(request: UnsubscribeRequest):
     # Retirer de MailerLite
     mark_subscriber_unsubscribed(email)
     
-    logger.debug(f"Subscriber unsubscribed: {email}")
+    logger.debug("Subscriber unsubscribed: %s", email)
     
     return {
         "message": "Vous avez été désinscrit de la newsletter avec succès.",
@@ -270,7 +270,7 @@ async def unsubscribe_from_newsletter(request: UnsubscribeRequest):
 
 
 @router.get("/unsubscribe")
-async def unsubscribe_get(token: str = Query(..., description="Token de désinscription")):
+def unsubscribe_get(token: str = Query(..., description="Token de désinscription")):
     """
     Endpoint GET de désinscription (lien dans les emails).
     Redirige vers une page de confirmation de désinscription avec le token.
@@ -293,7 +293,7 @@ async def unsubscribe_get(token: str = Query(..., description="Token de désinsc
 
 
 @router.get("/stats", response_model=SubscriberStats)
-async def get_subscriber_stats():
+def get_subscriber_stats():
     """
     Endpoint pour récupérer les statistiques des abonnés.
     (Protection admin recommandée en production)
@@ -303,32 +303,32 @@ async def get_subscriber_stats():
 
 
 @router.get("/check-subscriber/{email}")
-async def check_subscriber_status(email: str):
+def check_subscriber_status(email: str):
     """
     Vérifie si un email est abonné et actif pour appliquer une réduction.
     Retourne le code promo si l'abonné est confirmé ET n'a pas encore utilisé son code.
     """
     # Nettoyer et normaliser l'email
     clean_email = email.strip().lower()
-    logger.debug(f"Checking subscriber status for: {clean_email}")
+    logger.debug("Checking subscriber status for: %s", clean_email)
     
     subscriber = subscriber_repo.get_by_email(clean_email)
     
     if not subscriber:
-        logger.debug(f"Subscriber not found: {clean_email}")
+        logger.debug("Subscriber not found: %s", clean_email)
         return {
             "is_subscriber": False,
             "discount": 0,
             "promo_code": None
         }
     
-    logger.debug(f"Subscriber found - Status: {subscriber.get('status')}, Promo used: {subscriber.get('promo_used', False)}")
+    logger.debug("Subscriber found - Status: %s, Promo used: %s", subscriber.get('status'), subscriber.get('promo_used', False))
     
     # Vérifier si l'abonné est confirmé
     if subscriber.get("status") == SubscriberStatus.CONFIRMED.value:
         # Vérifier si le promo a déjà été utilisé
         if subscriber.get("promo_used", False):
-            logger.debug(f"Promo already used for: {clean_email}")
+            logger.debug("Promo already used for: %s", clean_email)
             return {
                 "is_subscriber": True,
                 "discount": 0,
@@ -336,7 +336,7 @@ async def check_subscriber_status(email: str):
                 "message": "Code promo déjà utilisé"
             }
         
-        logger.debug(f"Discount applicable for: {clean_email}")
+        logger.debug("Discount applicable for: %s", clean_email)
         return {
             "is_subscriber": True,
             "discount": 10,  # 10% de réduction
@@ -352,7 +352,7 @@ async def check_subscriber_status(email: str):
 
 
 @router.post("/mark-promo-used/{email}")
-async def mark_promo_as_used(email: str):
+def mark_promo_as_used(email: str):
     """
     Marque le code promo comme utilisé pour un email.
     Appelé après un paiement réussi.
@@ -373,7 +373,7 @@ async def mark_promo_as_used(email: str):
     })
     
     if success:
-        logger.debug(f"Promo code marked as used for: {clean_email}")
+        logger.debug("Promo code marked as used for: %s", clean_email)
         return {"message": "Code promo marqué comme utilisé"}
     
     raise HTTPException(
@@ -388,7 +388,7 @@ class ResendConfirmationRequest(BaseModel):
 
 
 @router.post("/resend-confirmation", response_model=dict)
-async def resend_confirmation(request: ResendConfirmationRequest):
+def resend_confirmation(request: ResendConfirmationRequest):
     """
     Renvoie l'email de confirmation pour un abonné pending.
     """
@@ -416,7 +416,7 @@ async def resend_confirmation(request: ResendConfirmationRequest):
     subscriber_repo.update(email, {"confirmation_token": confirmation_token})
     
     # MailerLite gère le renvoi automatiquement via le double opt-in
-    logger.debug(f"Confirmation email will be resent by MailerLite for {email}")
+    logger.debug("Confirmation email will be resent by MailerLite for %s", email)
     
     return {
         "message": "Email de confirmation renvoyé avec succès"
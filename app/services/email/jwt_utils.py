@@ -5,7 +5,7 @@ Tokens de confirmation et désinscription.
 
 import jwt
 import os
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Dict, Optional
 import logging
 
@@ -30,11 +30,12 @@ def generate_confirmation_token(email: str) -> str:
     Returns:
         Token JWT signé
     """
+    now = datetime.now(timezone.utc)
     payload = {
         "email": email.lower(),
         "type": "confirmation",
-        "exp": datetime.utcnow() + timedelta(hours=CONFIRMATION_TOKEN_EXPIRY_HOURS),
-        "iat": datetime.utcnow()
+        "exp": now + timedelta(hours=CONFIRMATION_TOKEN_EXPIRY_HOURS),
+        "iat": now
     }
     
     token = jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
@@ -51,11 +52,12 @@ def generate_unsubscribe_token(email: str) -> str:
     Returns:
         Token JWT signé
     """
+    now = datetime.now(timezone.utc)
     payload = {
         "email": email.lower(),
         "type": "unsubscribe",
-        "exp": datetime.utcnow() + timedelta(days=UNSUBSCRIBE_TOKEN_EXPIRY_DAYS),
-        "iat": datetime.utcnow()
+        "exp": now + timedelta(days=UNSUBSCRIBE_TOKEN_EXPIRY_DAYS),
+        "iat": now
     }
     
     token = jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
@@ -11,11 +11,6 @@ from typing import Dict, List, Optional
 
 import requests
 
-# Configure logging pour ce module
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 BASE_URL = "https://connect.mailerlite.com/api"
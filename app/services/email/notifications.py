@@ -18,6 +18,9 @@ FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:5173")
 BASE_FRONTEND_URL = FRONTEND_URL.split(",")[0].strip() if FRONTEND_URL else "http://localhost:5173"
 BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8000")
 
+# Seuls champs des abonnés utilisés pour l'envoi des newsletters
+RECIPIENT_FIELDS = {"_id": 0, "email": 1, "unsubscribe_token": 1}
+
 
 def _format_price(price: Optional[float]) -> str:
     if price is None:
@@ -61,8 +64,8 @@ def _format_dimensions(width: Any, height: Any) -> str:
 def _update_stats_on_success(sent_count: int):
     if sent_count <= 0:
         return
-    for subscriber in subscriber_repo.get_active_subscribers():
-        subscriber_repo.increment_email_stats(subscriber.get("email"), sent=True)
+    # Un seul update_many sur le statut, sans relire les abonnés actifs
+    subscriber_repo.increment_active_subscribers_email_stats(sent=True)
 
 
 def notify_new_artwork(artwork_id: str) -> Dict[str, Any]:
@@ -77,7 +80,7 @@ def notify_new_artwork(artwork_id: str) -> Dict[str, Any]:
     subject = f"Nouvelle œuvre : {artwork.get('title')}"
 
     # Récupérer tous les abonnés actifs pour générer les URLs de désinscription personnalisées
-    subscribers = subscriber_repo.get_active_subscribers()
+    subscribers = subscriber_repo.get_active_subscribers(RECIPIENT_FIELDS)
     if not subscribers:
         logger.warning("No active subscribers found")
         return {"sent": 0, "failed": 0, "errors": []}
@@ -156,7 +159,7 @@ def notify_new_event(event_id: str) -> Dict[str, Any]:
     time_range = f"{event.get('start_time', '')} - {event.get('end_time', '')}"
 
     # Récupérer tous les abonnés actifs pour générer les URLs de désinscription personnalisées
-    subscribers = subscriber_repo.get_active_subscribers()
+    subscribers = subscriber_repo.get_active_subscribers(RECIPIENT_FIELDS)
     if not subscribers:
         logger.warning("No active subscribers found")
         return {"sent": 0, "failed": 0, "errors": []}
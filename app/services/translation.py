@@ -1,113 +1,265 @@
 import json
 import logging
 import os
-from typing import Dict, Iterable, Optional
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
 import requests
+from pymongo import UpdateOne
 
 logger = logging.getLogger(__name__)
 
 DEEPL_API_KEY = os.getenv("DEEPL_API_KEY", "ed6da66b-e4c8-4073-9b5b-b1c25a9dea60:fx")
 DEEPL_API_URL = "https://api-free.deepl.com/v2/translate"
+DEEPL_MAX_TEXTS_PER_REQUEST = 50
+
+SUPPORTED_LANGUAGES = {"fr", "en"}
+
+# Never sent to DeepL: description is translated manually, status is an enum
+NON_AUTO_TRANSLATED_FIELDS = frozenset({"description", "status"})
+
+# Shared session: keeps the TLS connection to DeepL alive between requests
+_deepl_session = requests.Session()
+
+# LRU cache of (source text, target language) -> translation; DeepL output is deterministic
+TRANSLATION_CACHE_SIZE = 10_000
+_translation_cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+_translation_cache_lock = threading.Lock()
+
+
+def resolve_language(lang: str) -> str:
+    """
+    Normalize the requested language, falling back to French when unsupported.
+    """
+    if not lang:
+        return "fr"
+    normalized = lang.lower()
+    return normalized if normalized in SUPPORTED_LANGUAGES else "fr"
+
+
+def _cache_get(key: Tuple[str, str]) -> Optional[str]:
+    with _translation_cache_lock:
+        value = _translation_cache.get(key)
+        if value is not None:
+            _translation_cache.move_to_end(key)
+        return value
+
+
+def _cache_set(key: Tuple[str, str], value: str) -> None:
+    with _translation_cache_lock:
+        _translation_cache[key] = value
+        _translation_cache.move_to_end(key)
+        if len(_translation_cache) > TRANSLATION_CACHE_SIZE:
+            _translation_cache.popitem(last=False)
+
+
+def _translate_many_with_deepl(texts: List[str], target_lang: str = "EN") -> List[Optional[str]]:
+    """
+    Translate several texts with as few DeepL calls as possible (up to 50 texts per request).
+    Texts already translated by this process are served from an in-memory LRU cache.
+    Returns one entry per input text, in order, with None for texts that could not be translated.
+    """
+    target_lang = target_lang.upper()
+    results: List[Optional[str]] = [_cache_get((text, target_lang)) for text in texts]
+    if not DEEPL_API_KEY:
+        return results
+
+    # Only send each distinct uncached text once
+    missing = list(dict.fromkeys(text for text, result in zip(texts, results) if result is None))
+    translated: Dict[str, str] = {}
+
+    for start in range(0, len(missing), DEEPL_MAX_TEXTS_PER_REQUEST):
+        batch = missing[start:start + DEEPL_MAX_TEXTS_PER_REQUEST]
+        try:
+            response = _deepl_session.post(
+                DEEPL_API_URL,
+                data={
+                    "auth_key": DEEPL_API_KEY,
+                    "text": batch,
+                    "target_lang": target_lang,
+                    "source_lang": "FR"
+                },
+                timeout=10
+            )
+            if response.status_code == 200:
+                translations = response.json().get("translations") or []
+                for text, translation in zip(batch, translations):
+                    value = translation.get("text")
+                    if value:
+                        translated[text] = value
+                        _cache_set((text, target_lang), value)
+            else:
+                logger.error("DeepL API error: %s - %s", response.status_code, response.text)
+        except Exception as exc:
+            logger.error("DeepL translation failed: %s", exc)
+
+    return [result if result is not None else translated.get(text) for text, result in zip(texts, results)]
+
 
 def _translate_with_deepl(text: str, target_lang: str = "EN") -> Optional[str]:
     """
     Translate text using DeepL API.
     Returns the translated text or None on failure.
     """
-    if not text or not DEEPL_API_KEY:
+    if not text:
         return None
-    
-    try:
-        response = requests.post(
-            DEEPL_API_URL,
-            data={
-                "auth_key": DEEPL_API_KEY,
-                "text": text,
-                "target_lang": target_lang.upper(),
-                "source_lang": "FR"
-            },
-            timeout=10
-        )
-        
-        if response.status_code == 200:
-            result = response.json()
-            if result.get("translations") and len(result["translations"]) > 0:
-                return result["translations"][0]["text"]
-        else:
-            logger.error(f"DeepL API error: {response.status_code} - {response.text}")
-    except Exception as exc:
-        logger.error(f"DeepL translation failed: {exc}")
-    
-    return None
+    return _translate_many_with_deepl([text], target_lang)[0]
 
 
-def _translate_payload(payload: Dict[str, str], target_language: str) -> Dict[str, str]:
+def _translate_payloads(payloads: List[Dict[str, str]], target_language: str) -> List[Dict[str, str]]:
     """
-    Translate a dictionary of strings using DeepL API.
+    Translate several dictionaries of strings using DeepL API, with a single batched call for all of them.
     Note: For manual translation workflow, this is kept for backward compatibility
     but won't auto-translate descriptions (handled by manual endpoint).
     """
+    target_lang_code = "EN" if target_language == "en" else target_language.upper()
+
+    # Skip description and status fields - description is handled manually, status is an enum
+    keys_per_payload = [
+        [
+            key for key, value in payload.items()
+            if value and isinstance(value, str) and key not in NON_AUTO_TRANSLATED_FIELDS
+        ]
+        for payload in payloads
+    ]
+    texts = [payload[key] for payload, keys in zip(payloads, keys_per_payload) for key in keys]
+    if not texts:
+        return [{} for _ in payloads]
+    results = iter(_translate_many_with_deepl(texts, target_lang_code))
+
+    translated_payloads = []
+    for keys in keys_per_payload:
+        translated = {key: next(results) for key in keys}
+        translated_payloads.append({key: value for key, value in translated.items() if value})
+    return translated_payloads
+
+
+def _translate_payload(payload: Dict[str, str], target_language: str) -> Dict[str, str]:
+    """
+    Translate a dictionary of strings using DeepL API, in a single request.
+    """
     if not payload:
         return {}
+    return _translate_payloads([payload], target_language)[0]
 
-    translated = {}
-    target_lang_code = "EN" if target_language == "en" else target_language.upper()
-    
-    for key, value in payload.items():
-        if not value or not isinstance(value, str):
-            continue
-        
-        # Skip description and status fields - description is handled manually, status is an enum
-        if key in ["description", "status"]:
-            continue
-            
-        result = _translate_with_deepl(value, target_lang_code)
-        if result:
-            translated[key] = result
-    
-    return translated
 
+def _missing_translations(document: dict, fields: Iterable[str], target_language: str) -> Dict[str, str]:
+    """
+    Source values of the fields that have no translation yet for the requested language.
+    """
+    lang_translations = document.get("translations", {}).get(target_language, {}) or {}
+    return {
+        field: document.get(field)
+        for field in fields
+        if lang_translations.get(field) is None and document.get(field)
+    }
 
-def apply_dynamic_translations(
+
+def has_missing_translations(document: dict, fields: Iterable[str], target_language: str) -> bool:
+    """
+    True if an automatically translated field with source text still has no translation
+    for the requested language (e.g. DeepL was unavailable). Works on the documents returned by apply_dynamic_translations.
+    """
+    if not document or target_language == "fr":
+        return False
+    auto_fields = [field for field in fields if field not in NON_AUTO_TRANSLATED_FIELDS]
+    return bool(_missing_translations(document, auto_fields, target_language))
+
+
+def _merge_translations(
     document: dict,
     fields: Iterable[str],
     target_language: str,
-    collection=None,
+    new_values: Dict[str, str],
 ) -> dict:
     """
-    Ensure the requested language exists for the given fields and update the database if needed.
+    Add new_values to the document translations for the requested language.
     Returns a copy of the document with the translated values applied.
     """
-    if not document or target_language == "fr":
-        return dict(document) if document else document
-
     translations = document.get("translations", {})
     lang_translations = translations.get(target_language, {}) or {}
-    fields_to_translate: Dict[str, str] = {}
-
-    for field in fields:
-        existing_value = lang_translations.get(field)
-        source_value = document.get(field)
-        if existing_value is None and source_value:
-            fields_to_translate[field] = source_value
-
-    if fields_to_translate:
-        new_values = _translate_payload(fields_to_translate, target_language)
-        if new_values:
-            lang_translations.update(new_values)
-            translations[target_language] = lang_translations
-            if collection is not None and document.get("_id"):
-                try:
-                    collection.update_one(
-                        {"_id": document["_id"]},
-                        {"$set": {"translations": translations}},
-                    )
-                except Exception as exc:
-                    logger.error("Failed to persist translations: %s", exc)
 
     updated_document = dict(document)
+    if new_values:
+        lang_translations.update(new_values)
+        translations[target_language] = lang_translations
+        updated_document["translations"] = translations
+
     for field in fields:
         translated_value = lang_translations.get(field)
         if translated_value:
             updated_document[field] = translated_value
     return updated_document
+
+
+def _translation_update(document: dict, target_language: str, new_values: Dict[str, str]) -> dict:
+    """
+    Update operation persisting new translations.
+    Only the new fields are written (dotted paths), so concurrent writers cannot clobber each
+    other's translations. A language entry stored as null cannot hold dotted paths and is replaced.
+    """
+    if document.get("translations", {}).get(target_language, {}) is None:
+        return {"$set": {f"translations.{target_language}": dict(new_values)}}
+    return {"$set": {f"translations.{target_language}.{field}": value for field, value in new_values.items()}}
+
+
+def apply_dynamic_translations(
+    document: dict,
+    fields: Iterable[str],
+    target_language: str,
+    collection=None,
+) -> dict:
+    """
+    Ensure the requested language exists for the given fields and update the database if needed.
+    Returns a copy of the document with the translated values applied.
+    """
+    if not document or target_language == "fr":
+        return dict(document) if document else document
+
+    missing = _missing_translations(document, fields, target_language)
+    new_values = _translate_payload(missing, target_language)
+    update = _translation_update(document, target_language, new_values) if new_values else None
+    updated_document = _merge_translations(document, fields, target_language, new_values)
+    if update and collection is not None and document.get("_id"):
+        try:
+            collection.update_one({"_id": document["_id"]}, update)
+        except Exception as exc:
+            logger.error("Failed to persist translations: %s", exc)
+    return updated_document
+
+
+def apply_dynamic_translations_many(
+    documents: Iterable[dict],
+    fields: Iterable[str],
+    target_language: str,
+    collection=None,
+) -> List[dict]:
+    """
+    apply_dynamic_translations for a list of documents.
+    Missing translations of every document are sent to DeepL together, and the new
+    translations are persisted with a single unordered bulk_write.
+    """
+    if target_language == "fr":
+        return [dict(document) for document in documents]
+
+    documents = list(documents)
+    fields = tuple(fields)
+    missing = [_missing_translations(document, fields, target_language) for document in documents]
+    new_values_per_document = _translate_payloads(missing, target_language)
+
+    updated_documents = []
+    operations = []
+    for document, new_values in zip(documents, new_values_per_document):
+        if new_values and document.get("_id"):
+            operations.append(UpdateOne(
+                {"_id": document["_id"]},
+                _translation_update(document, target_language, new_values),
+            ))
+        updated_documents.append(_merge_translations(document, fields, target_language, new_values))
+
+    if operations and collection is not None:
+        try:
+            collection.bulk_write(operations, ordered=False)
+        except Exception as exc:
+            logger.error("Failed to persist translations: %s", exc)
+    return updated_documents
@@ -0,0 +1,40 @@
+"""
+Sérialisation JSON rapide basée sur orjson.
+"""
+from typing import Any, Iterable, Iterator
+
+import orjson
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+
+
+def orjson_default(value: Any) -> Any:
+    """Convertit les types non gérés nativement par orjson (ObjectId)."""
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Type {type(value).__name__} non sérialisable en JSON")
+
+
+def dumps(content: Any) -> bytes:
+    """Sérialise en bytes JSON (datetime natif, ObjectId converti en str)."""
+    return orjson.dumps(content, default=orjson_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class OrjsonResponse(JSONResponse):
+    """Réponse JSON sérialisée avec orjson au lieu du module json standard."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def iter_json_array(items: Iterable[Any]) -> Iterator[bytes]:
+    """Produit un tableau JSON morceau par morceau (un élément à la fois) pour StreamingResponse."""
+    yield b"["
+    first = True
+    for item in items:
+        if first:
+            first = False
+            yield dumps(item)
+        else:
+            yield b"," + dumps(item)
+    yield b"]"
@@ -0,0 +1,26 @@
+from functools import lru_cache
+from typing import Optional
+
+from bson.objectid import ObjectId
+
+
+def parse_object_id(value: str) -> Optional[ObjectId]:
+    """
+    Convertit un identifiant texte en ObjectId (None s'il est invalide).
+    Seules les chaînes sont acceptées : ObjectId(None) générerait un nouvel id, qui serait
+    ensuite renvoyé par le cache à chaque appel.
+    """
+    if not isinstance(value, str):
+        return None
+    return _parse_object_id_str(value)
+
+
+@lru_cache(maxsize=4096)
+def _parse_object_id_str(value: str) -> Optional[ObjectId]:
+    """
+    Mis en cache : les mêmes identifiants reviennent souvent (relectures, pages admin).
+    """
+    try:
+        return ObjectId(value)
+    except Exception:
+        return None
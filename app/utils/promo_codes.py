@@ -0,0 +1,24 @@
+import secrets
+from typing import List
+
+PROMO_CODE_PREFIX = "EC10-"
+PROMO_CODE_BYTES = 3
+
+
+def generate_promo_codes(count: int) -> List[str]:
+    """
+    Génère `count` codes promo (ex: EC10-AB12C3) à partir d'un seul tirage
+    aléatoire, découpé ensuite en tranches de PROMO_CODE_BYTES octets.
+    """
+    if count <= 0:
+        return []
+    blob = secrets.token_bytes(PROMO_CODE_BYTES * count)
+    return [
+        PROMO_CODE_PREFIX + blob[i:i + PROMO_CODE_BYTES].hex().upper()
+        for i in range(0, len(blob), PROMO_CODE_BYTES)
+    ]
+
+
+def generate_promo_code() -> str:
+    """Génère un code promo unique (ex: EC10-AB12C3)"""
+    return generate_promo_codes(1)[0]
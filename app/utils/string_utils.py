@@ -1,5 +1,8 @@
 import re
 import unicodedata
+from urllib.parse import unquote_plus
+
+NON_ALNUM_RE = re.compile(r'[^a-z0-9]+')
 
 
 def normalize_string(value: str) -> str:
@@ -20,5 +23,19 @@ def normalize_string(value: str) -> str:
     s = ''.join(ch for ch in s if not unicodedata.combining(ch))
     s = s.lower()
     # garder uniquement lettres et chiffres
-    s = re.sub(r'[^a-z0-9]+', '', s)
+    s = NON_ALNUM_RE.sub('', s)
     return s
+
+
+def decode_path_param(value: str) -> str:
+    """
+    Décode un paramètre de path (plus et %xx), en tolérant un double-encodage.
+    Exemple: 'Plan%2B3D' -> 'Plan 3D'
+    """
+    decoded = value
+    for _ in range(2):
+        new = unquote_plus(decoded)
+        if new == decoded:
+            break
+        decoded = new
+    return decoded
@@ -0,0 +1,50 @@
+from typing import Dict, Iterable, List, Tuple
+
+
+def field_changed(field: str, value) -> dict:
+    """Expression d'agrégation vraie si le champ stocké diffère de la nouvelle valeur."""
+    return {"$ne": [f"${field}", {"$literal": value}]}
+
+
+def build_update_pipeline(
+    update_data: Dict,
+    translatable_fields: Iterable[str],
+    language: str = "en",
+) -> Tuple[List[dict], dict]:
+    """
+    Construit une mise à jour par pipeline qui écrit update_data et retire, dans la même
+    écriture, les traductions `translations.<language>` des champs traduisibles modifiés.
+    Les comparaisons se font côté serveur, sur le document tel qu'il est au moment de l'écriture.
+
+    Returns:
+        (pipeline, any_changed) : any_changed est l'expression vraie si au moins un champ change
+    """
+    changed = {field: field_changed(field, value) for field, value in update_data.items()}
+    # $literal : une chaîne commençant par "$" ou un dict ne doivent pas être lus comme des expressions
+    stage = {field: {"$literal": value} for field, value in update_data.items()}
+
+    stale_fields = [
+        {"$cond": [changed[field], [field], []]}
+        for field in update_data
+        if field in translatable_fields
+    ]
+    if stale_fields:
+        kept_translations = {
+            "$arrayToObject": {
+                "$filter": {
+                    "input": {"$objectToArray": f"$translations.{language}"},
+                    "as": "translation",
+                    "cond": {"$not": [{"$in": ["$$translation.k", {"$concatArrays": stale_fields}]}]},
+                }
+            }
+        }
+        # Documents sans traduction pour cette langue : translations laissé tel quel (ou absent)
+        stage["translations"] = {
+            "$cond": [
+                f"$translations.{language}",
+                {"$mergeObjects": ["$translations", {language: kept_translations}]},
+                "$translations",
+            ]
+        }
+
+    return [{"$set": stage}], {"$or": list(changed.values())}
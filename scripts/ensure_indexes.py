@@ -0,0 +1,29 @@
+"""
+Crée les index MongoDB de l'application (à lancer une fois par déploiement).
+Sur une base existante, lancer d'abord scripts/migrate_normalized_fields.py.
+
+Usage, depuis la racine du projet :
+    python -m scripts.ensure_indexes
+"""
+import logging
+import sys
+
+from app.database import ensure_indexes, get_database
+
+logger = logging.getLogger(__name__)
+
+
+def main() -> int:
+    try:
+        get_database()
+    except Exception as e:
+        logger.error("❌ %s", e)
+        return 1
+    ensure_indexes()
+    logger.info("✅ Index MongoDB à jour")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""
+Migration ponctuelle : renseigne les champs normalisés sur les documents créés avant
+leur ajout (normalized_name des types d'œuvres, type_norm des œuvres). À lancer une
+fois, avant scripts/ensure_indexes.py (l'index unique sur normalized_name suppose que
+tous les types d'œuvres l'ont).
+
+Usage, depuis la racine du projet :
+    python -m scripts.migrate_normalized_fields
+"""
+import logging
+import sys
+
+from app.database import artwork_types_collection, artworks_collection, get_database
+from app.utils.string_utils import normalize_string
+
+logger = logging.getLogger(__name__)
+
+
+def backfill_artwork_type_normalized_names() -> int:
+    """Renseigne normalized_name sur les types d'œuvres créés avant l'ajout du champ."""
+    updated = 0
+    for type_doc in artwork_types_collection.find({"normalized_name": {"$exists": False}}, {"name": 1}):
+        result = artwork_types_collection.update_one(
+            {"_id": type_doc["_id"]},
+            {"$set": {"normalized_name": normalize_string(type_doc.get("name", ""))}}
+        )
+        updated += result.modified_count
+    return updated
+
+
+
+def backfill_artwork_normalized_types() -> int:
+    """Renseigne type_norm sur les œuvres créées avant l'ajout du champ (une requête par type distinct)."""
+    missing = {"type_norm": {"$exists": False}}
+    updated = 0
+    for artwork_type in artworks_collection.distinct("type", missing):
+        result = artworks_collection.update_many(
+            {**missing, "type": artwork_type},
+            {"$set": {"type_norm": normalize_string(artwork_type) if artwork_type else None}}
+        )
+        updated += result.modified_count
+    # Œuvres sans champ type du tout
+    result = artworks_collection.update_many(
+        {**missing, "type": {"$exists": False}},
+        {"$set": {"type_norm": None}}
+    )
+    return updated + result.modified_count
+
+
+def main() -> int:
+    try:
+        get_database()
+    except Exception as e:
+        logger.error("❌ %s", e)
+        return 1
+    logger.info("✅ normalized_name renseigné sur %d type(s) d'œuvre", backfill_artwork_type_normalized_names())
+    logger.info("✅ type_norm renseigné sur %d œuvre(s)", backfill_artwork_normalized_types())
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    sys.exit(main())